@@ -49,7 +49,8 @@ class ServiceContainer:
         config_dir = Path(config_file).parent
         users_path = config_dir / "users.json"
         sessions_path = config_dir / "user_sessions.json"
-        user_manager = UserManager(str(users_path), str(sessions_path))
+        session_backend = llm_client.config.get("sessions", {}).get("backend", "json")
+        user_manager = UserManager(str(users_path), str(sessions_path), session_backend=session_backend)
         try:
             from backend.services.rag.rag_system import RAGSystem as _RAGSystem
 
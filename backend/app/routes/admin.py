@@ -101,20 +101,15 @@ def create_blueprint(ctx: RouteContext) -> Blueprint:
 
         payload = request.get_json(silent=True) or {}
 
-        user_data = user_manager.users[username]
-
-        # Update allowed fields
-        if "email" in payload:
-            user_data["email"] = payload["email"]
-        if "role" in payload:
-            user_data["role"] = payload["role"]
-        if "display_name" in payload:
-            user_data["display_name"] = payload["display_name"]
-        if "is_active" in payload:
-            user_data["is_active"] = payload["is_active"]
+        # Update allowed fields (goes through UserManager to keep its indexes in sync)
+        updates = {
+            field: payload[field]
+            for field in ("email", "role", "display_name", "is_active")
+            if field in payload
+        }
+        user_manager.update_user(username, updates)
 
-        # Save changes
-        user_manager._save_users()
+        user_data = user_manager.users[username]
 
         return jsonify({
             "success": True,
@@ -141,15 +136,7 @@ def create_blueprint(ctx: RouteContext) -> Blueprint:
         if not new_password:
             raise ValidationError("New password is required")
 
-        # Update password
-        user_data = user_manager.users[username]
-        salt = user_manager._generate_salt()
-        password_hash = user_manager._hash_password(new_password, salt)
-
-        user_data["password_hash"] = password_hash
-        user_data["salt"] = salt
-
-        user_manager._save_users()
+        user_manager.reset_password(username, new_password)
 
         return jsonify({
             "success": True,
@@ -10,26 +10,47 @@ Refactored from legacy llm_client.py with improved:
 
 from __future__ import annotations
 
+import copy
+import functools
+import hashlib
 import json
 import logging
+import os
+import threading
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import requests
 
 from backend.core.llm.models import ModelConfig, LLMResponse
 from backend.utils.exceptions import LLMError, LLMConnectionError, LLMTimeoutError
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=8)
+def _parse_config_cached(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a config file once per (path, mtime); callers must copy the result."""
+    data = Path(path).read_bytes()
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data.decode('utf-8'))
+
+
 class LLMClient:
     """
     Main interface for LLM operations using Ollama backend.
 
     Features:
     - Automatic model preloading
+    - Pooled HTTP connections, one session per thread (safe across forks)
     - Configurable parameters (temperature, context window, etc.)
     - Comprehensive error handling
     - Performance metrics tracking
@@ -43,8 +64,12 @@ class LLMClient:
             config_path: Path to configuration JSON file
             config_dict: Configuration dictionary (alternative to file)
         """
+        self._local = threading.local()
+        self._session_pid = os.getpid()
+        self.config_path: Path | None = None
         self.config = self._load_config(config_path, config_dict)
         self.model_config = ModelConfig.from_dict(self.config.get("ollama", {}))
+        self._init_response_cache()
         self._initialize()
 
     def _load_config(
@@ -60,39 +85,167 @@ class LLMClient:
             config_path = Path(__file__).resolve().parents[3] / "config.json"
 
         config_path = Path(config_path)
+        self.config_path = config_path
 
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            config = _parse_config_cached(str(config_path), os.stat(config_path).st_mtime_ns)
+            # The parsed dict is shared between clients; hand out a private copy
+            return copy.deepcopy(config)
         except FileNotFoundError:
             raise LLMError(f"Configuration file not found: {config_path}")
         except json.JSONDecodeError as e:
             raise LLMError(f"Invalid JSON in configuration file: {e}")
 
+    def _init_response_cache(self) -> None:
+        """Open the on-disk response cache (opt-in via ``ollama.response_cache``; requires diskcache)."""
+        self._response_cache = None
+        ollama_config = self.config.get("ollama", {})
+        if not ollama_config.get("response_cache", False):
+            return
+
+        try:
+            import diskcache
+
+            self._response_cache = diskcache.Cache(
+                ollama_config.get("cache_dir", ".cache/llm"),
+                eviction_policy="least-recently-used",
+            )
+        except ImportError:
+            logger.debug("diskcache not installed, LLM response caching disabled")
+        except Exception as e:
+            logger.warning(f"LLM response cache unavailable (non-fatal): {e}")
+
+    def _cache_key(self, options: Dict[str, Any], *parts: Any) -> Optional[str]:
+        """
+        Return a cache key for a request, or None if it should not be cached.
+
+        Only deterministic requests (temperature <= 0) are cached unless
+        ``ollama.always_cache`` is set.
+        """
+        if self._response_cache is None:
+            return None
+        if options.get("temperature", 1) > 0 and not self.config.get("ollama", {}).get("always_cache"):
+            return None
+
+        key_parts = [self.model, options, *parts]
+        if HAS_ORJSON:
+            key_data = orjson.dumps(key_parts, option=orjson.OPT_SORT_KEYS, default=str)
+        else:
+            key_data = json.dumps(key_parts, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.blake2b(key_data).hexdigest()
+
+    def _cache_store(self, key: Optional[str], result: Dict[str, Any]) -> None:
+        """Store a raw Ollama response under ``key`` (no-op when uncached)."""
+        if key is None:
+            return
+        try:
+            self._response_cache.set(key, result, expire=self.config.get("ollama", {}).get("cache_ttl"))
+        except Exception as e:
+            logger.warning(f"Failed to cache LLM response: {e}")
+
+    def _get_session(self) -> requests.Session:
+        """
+        Return the calling thread's HTTP session.
+
+        requests.Session is not thread-safe, so each thread gets its own. A
+        forked worker must not reuse the parent's pooled sockets, so all
+        sessions are dropped when the process id changes.
+        """
+        pid = os.getpid()
+        if pid != self._session_pid:
+            self._local = threading.local()
+            self._session_pid = pid
+
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
     def _initialize(self) -> None:
         """Initialize client and preload model."""
         self.ollama_url = self.model_config.host
         self.model = self.model_config.model
         self.timeout = self.model_config.timeout / 1000  # Convert ms to seconds
 
+        # Per-request options start from a copy of these
+        self._base_options = {
+            "num_ctx": self.model_config.num_ctx,
+            "temperature": self.model_config.temperature,
+            "top_p": self.model_config.top_p,
+            "top_k": self.model_config.top_k,
+            "num_gpu": -1,  # Use all GPUs
+            "num_thread": 1,
+        }
+
         logger.info(f"Initializing LLM client: {self.model} @ {self.ollama_url}")
         self._preload_model()
 
     def _preload_model(self) -> None:
-        """Preload model to reduce cold start latency."""
+        """
+        Preload model to reduce cold start latency.
+
+        When ``ollama.warmup_system_prompt`` is configured, a one-token chat
+        request is sent with it so the prompt prefix is already in the KV
+        cache when the first user turn arrives. Set ``ollama.preload`` to
+        false to skip this (e.g. serverless); ``FORCE_PRELOAD=1`` overrides.
+        """
+        ollama_config = self.config.get("ollama", {})
+        if not ollama_config.get("preload", True) and os.environ.get("FORCE_PRELOAD") != "1":
+            return
+
+        warmup = ollama_config.get("warmup_system_prompt")
+        start_time = time.time()
+
         try:
-            url = f"{self.ollama_url}/api/generate"
-            payload = {
-                "model": self.model,
-                "prompt": "",
-                "stream": False,
-                "options": {"num_predict": 1}
-            }
-            requests.post(url, json=payload, timeout=30)
-            logger.info(f"Model preloaded: {self.model}")
+            if warmup:
+                url = f"{self.ollama_url}/api/chat"
+                payload = {
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": warmup},
+                        {"role": "user", "content": "warmup"},
+                    ],
+                    "stream": False,
+                    "options": {"num_predict": 1, "num_ctx": self.model_config.num_ctx}
+                }
+            else:
+                url = f"{self.ollama_url}/api/generate"
+                payload = {
+                    "model": self.model,
+                    "prompt": "",
+                    "stream": False,
+                    "options": {"num_predict": 1}
+                }
+            # Prefilling a long system prompt can take far longer than a bare load
+            timeout = max(self.timeout, 30) if warmup else 30
+            self._get_session().post(url, json=payload, timeout=timeout)
+            logger.info(f"Model preloaded: {self.model} in {time.time() - start_time:.1f}s")
         except Exception as e:
             logger.warning(f"Model preload failed (non-fatal): {e}")
 
+    def _initialize_client(self) -> None:
+        """Re-apply ``self.config["ollama"]`` after it has been modified."""
+        self.model_config = ModelConfig.from_dict(self.config.get("ollama", {}))
+        self._initialize()
+
+    def _chat_options(
+        self,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        overrides: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build chat options from the base options plus per-call overrides."""
+        options = dict(self._base_options)
+        if temperature is not None:
+            options["temperature"] = temperature
+        for key in ("num_ctx", "top_p", "top_k"):
+            if key in overrides:
+                options[key] = overrides[key]
+        if max_tokens is not None:
+            options["num_predict"] = max_tokens
+        return options
+
     def chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -118,18 +271,7 @@ class LLMClient:
         """
         url = f"{self.ollama_url}/api/chat"
 
-        # Build options with defaults
-        options = {
-            "num_ctx": kwargs.get("num_ctx", self.model_config.num_ctx),
-            "temperature": temperature if temperature is not None else self.model_config.temperature,
-            "top_p": kwargs.get("top_p", self.model_config.top_p),
-            "top_k": kwargs.get("top_k", self.model_config.top_k),
-            "num_gpu": -1,  # Use all GPUs
-            "num_thread": 1,
-        }
-
-        if max_tokens is not None:
-            options["num_predict"] = max_tokens
+        options = self._chat_options(temperature, max_tokens, kwargs)
 
         payload = {
             "model": self.model,
@@ -138,14 +280,21 @@ class LLMClient:
             "options": options
         }
 
+        cache_key = self._cache_key(options, "chat", messages)
+        if cache_key is not None:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                return self._parse_chat_response(cached, 0.0)
+
         start_time = time.time()
 
         try:
-            response = requests.post(url, json=payload, timeout=self.timeout)
+            response = self._get_session().post(url, json=payload, timeout=self.timeout)
             response.raise_for_status()
 
             elapsed_time = time.time() - start_time
             result = response.json()
+            self._cache_store(cache_key, result)
 
             return self._parse_chat_response(result, elapsed_time)
 
@@ -158,6 +307,83 @@ class LLMClient:
         except Exception as e:
             raise LLMError(f"Unexpected error: {e}")
 
+    def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        on_token: Callable[[str], None],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        """
+        Chat completion that hands each generated chunk to ``on_token`` as it arrives.
+
+        Lets callers start post-processing (parsing, forwarding to a client)
+        while the model is still decoding. Total generation time is the same
+        as chat_completion and per-line parsing adds a little overhead, so
+        prefer chat_completion when nothing consumes partial output.
+        Streamed responses are not cached.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            on_token: Called with each content chunk in order
+            temperature: Sampling temperature (0.0 to 2.0)
+            max_tokens: Maximum tokens to generate
+            **kwargs: Additional model parameters (num_ctx, top_p, top_k)
+
+        Returns:
+            LLMResponse with the full content, same as chat_completion
+
+        Raises:
+            LLMConnectionError: If connection to Ollama fails
+            LLMTimeoutError: If request times out
+        """
+        url = f"{self.ollama_url}/api/chat"
+
+        options = self._chat_options(temperature, max_tokens, kwargs)
+
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "stream": True,
+            "options": options
+        }
+
+        start_time = time.time()
+        chunks: List[str] = []
+        result: Dict[str, Any] = {}
+
+        try:
+            with self._get_session().post(url, json=payload, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    result = orjson.loads(line) if HAS_ORJSON else json.loads(line)
+                    if result.get("error"):
+                        raise LLMError(f"Ollama error: {result['error']}")
+
+                    token = result.get("message", {}).get("content", "")
+                    if token:
+                        chunks.append(token)
+                        on_token(token)
+
+            # The final line carries the metrics; give it the assembled content
+            result["message"] = {"role": "assistant", "content": "".join(chunks)}
+            return self._parse_chat_response(result, time.time() - start_time)
+
+        except LLMError:
+            raise
+        except requests.Timeout:
+            raise LLMTimeoutError(f"Request timed out after {self.timeout}s")
+        except requests.ConnectionError as e:
+            raise LLMConnectionError(f"Failed to connect to Ollama: {e}")
+        except requests.HTTPError as e:
+            raise LLMError(f"HTTP error from Ollama: {e}")
+        except Exception as e:
+            raise LLMError(f"Unexpected error: {e}")
+
     def _parse_chat_response(self, result: Dict[str, Any], elapsed_time: float) -> LLMResponse:
         """Parse Ollama chat response into LLMResponse object."""
         content = result.get("message", {}).get("content", "")
@@ -199,14 +425,9 @@ class LLMClient:
         """
         url = f"{self.ollama_url}/api/generate"
 
-        options = {
-            "num_ctx": self.model_config.num_ctx,
-            "temperature": temperature if temperature is not None else self.model_config.temperature,
-            "top_p": self.model_config.top_p,
-            "top_k": self.model_config.top_k,
-            "num_gpu": -1,
-            "num_thread": 1,
-        }
+        options = dict(self._base_options)
+        if temperature is not None:
+            options["temperature"] = temperature
 
         if max_tokens is not None:
             options["num_predict"] = max_tokens
@@ -221,14 +442,26 @@ class LLMClient:
         if system_prompt:
             payload["system"] = system_prompt
 
+        cache_key = self._cache_key(options, "generate", system_prompt, prompt)
+        if cache_key is not None:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                return LLMResponse(
+                    content=cached.get("response", ""),
+                    model=self.model,
+                    processing_time_ms=0.0,
+                    raw_response=cached
+                )
+
         start_time = time.time()
 
         try:
-            response = requests.post(url, json=payload, timeout=self.timeout)
+            response = self._get_session().post(url, json=payload, timeout=self.timeout)
             response.raise_for_status()
 
             elapsed_time = time.time() - start_time
             result = response.json()
+            self._cache_store(cache_key, result)
 
             return LLMResponse(
                 content=result.get("response", ""),
@@ -244,6 +477,74 @@ class LLMClient:
         except Exception as e:
             raise LLMError(f"Unexpected error: {e}")
 
+    def embed_batch(
+        self,
+        texts: List[str],
+        model: Optional[str] = None,
+        batch_size: int = 32,
+    ) -> List[List[float]]:
+        """
+        Embed many texts with as few HTTP round trips as possible.
+
+        Uses Ollama's native ``/api/embed`` endpoint, which accepts a list of
+        inputs per request. Servers that predate it (no ``embeddings`` key in
+        the response) fall back to one ``/api/embeddings`` call per text.
+
+        Args:
+            texts: Texts to embed
+            model: Embedding model (defaults to ``ollama.embed_model`` or the chat model)
+            batch_size: Maximum number of texts sent per request
+
+        Returns:
+            One embedding vector per input text, in input order
+
+        Raises:
+            LLMConnectionError: If connection to Ollama fails
+            LLMTimeoutError: If request times out
+        """
+        if not texts:
+            return []
+
+        model = model or self.config.get("ollama", {}).get("embed_model", self.model)
+        timeout = max(self.timeout, 60)
+        batch_size = max(1, batch_size)
+        embeddings: List[List[float]] = []
+
+        try:
+            for start in range(0, len(texts), batch_size):
+                batch = texts[start:start + batch_size]
+                response = self._get_session().post(
+                    f"{self.ollama_url}/api/embed",
+                    json={"model": model, "input": batch},
+                    timeout=timeout,
+                )
+                result = response.json() if response.ok else {}
+
+                if "embeddings" in result:
+                    embeddings.extend(result["embeddings"])
+                    continue
+
+                # Legacy servers only expose the single-prompt endpoint
+                for text in batch:
+                    response = self._get_session().post(
+                        f"{self.ollama_url}/api/embeddings",
+                        json={"model": model, "prompt": text},
+                        timeout=timeout,
+                    )
+                    response.raise_for_status()
+                    embeddings.append(response.json().get("embedding", []))
+
+            return embeddings
+
+        except requests.Timeout:
+            raise LLMTimeoutError(f"Request timed out after {timeout}s")
+        except requests.ConnectionError as e:
+            raise LLMConnectionError(f"Failed to connect to Ollama: {e}")
+        except requests.HTTPError as e:
+            raise LLMError(f"HTTP error from Ollama: {e}")
+        except Exception as e:
+            raise LLMError(f"Unexpected error: {e}")
+
     def list_models(self) -> List[Dict[str, Any]]:
         """
         List available models from Ollama.
@@ -254,7 +555,7 @@ class LLMClient:
         url = f"{self.ollama_url}/api/tags"
 
         try:
-            response = requests.get(url, timeout=10)
+            response = self._get_session().get(url, timeout=10)
             response.raise_for_status()
             result = response.json()
             return result.get("models", [])
@@ -270,7 +571,7 @@ class LLMClient:
             True if service is reachable and responding
         """
         try:
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=5)
+            response = self._get_session().get(f"{self.ollama_url}/api/tags", timeout=5)
             return response.status_code == 200
         except Exception:
             return False
@@ -281,8 +582,19 @@ class LLMClient:
         return self.config
 
     def save_config(self, path: str | Path) -> None:
-        """Save current configuration to file."""
+        """Save current configuration to file (skipped if the file already holds it)."""
         path = Path(path)
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(self.config, f, indent=2, ensure_ascii=False)
+        if HAS_ORJSON:
+            serialized = orjson.dumps(self.config, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            serialized = json.dumps(self.config, indent=2, ensure_ascii=False).encode('utf-8')
+        # Compare against what is on disk now, so external edits are still overwritten
+        try:
+            if path.stat().st_size == len(serialized) and path.read_bytes() == serialized:
+                return
+        except OSError:
+            pass
+
+        with open(path, 'wb') as f:
+            f.write(serialized)
         logger.info(f"Configuration saved to {path}")
@@ -4,22 +4,175 @@ User Management System for HE team LLM assistant
 Handles user authentication, session management, and per-user data storage
 """
 
+import atexit
+import base64
+import hashlib
+import heapq
+import hmac
 import json
+import logging
 import os
 import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import MutableMapping
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+logger = logging.getLogger(__name__)
+
+# Stored password format: "scrypt$" + base64(salt + derived key)
+_PASSWORD_PREFIX = "scrypt$"
+_SALT_BYTES = 16
+_SCRYPT_PARAMS = {'n': 2 ** 14, 'r': 8, 'p': 1, 'dklen': 64}
+
+# (epoch second, ISO string) of the most recently formatted timestamp
+_last_iso = (-1, "")
+
+
+def _iso_seconds(timestamp: float) -> str:
+    """ISO-format a timestamp at one-second resolution, reusing the last result"""
+    global _last_iso
+    second = int(timestamp)
+    cached_second, cached_iso = _last_iso
+    if second == cached_second:
+        return cached_iso
+    iso = datetime.fromtimestamp(second).isoformat()
+    _last_iso = (second, iso)
+    return iso
+
+
+def _now_iso() -> str:
+    """Current local time as an ISO string, at one-second resolution"""
+    return _iso_seconds(time.time())
+
+
+class SqliteSessionStore(MutableMapping):
+    """
+    Session token -> session dict mapping backed by SQLite (WAL mode).
+    
+    Lookups, writes and expiry touch single indexed rows, so large session
+    stores are never loaded or rewritten as a whole. Values are copies:
+    modified session dicts must be assigned back to persist.
+    """
+    
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "token TEXT PRIMARY KEY, user_id TEXT, last_activity_ts REAL, data BLOB)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_activity ON sessions(last_activity_ts)")
+    
+    @staticmethod
+    def _dumps(session_data: Dict) -> bytes:
+        if HAS_ORJSON:
+            return orjson.dumps(session_data)
+        return json.dumps(session_data, ensure_ascii=False).encode('utf-8')
+    
+    @staticmethod
+    def _loads(data: bytes) -> Dict:
+        if HAS_ORJSON:
+            return orjson.loads(data)
+        return json.loads(data.decode('utf-8'))
+    
+    def __getitem__(self, token: str) -> Dict:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM sessions WHERE token = ?", (token,)).fetchone()
+        if row is None:
+            raise KeyError(token)
+        return self._loads(row[0])
+    
+    def __setitem__(self, token: str, session_data: Dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (token, user_id, last_activity_ts, data) VALUES (?, ?, ?, ?)",
+                (token, session_data.get('user_id'), session_data.get('last_activity_ts', 0), self._dumps(session_data))
+            )
+    
+    def __delitem__(self, token: str):
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE token = ?", (token,))
+        if cursor.rowcount == 0:
+            raise KeyError(token)
+    
+    def __contains__(self, token: object) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM sessions WHERE token = ?", (token,)).fetchone() is not None
+    
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            tokens = [row[0] for row in self._conn.execute("SELECT token FROM sessions")]
+        return iter(tokens)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    
+    def items(self):
+        """All (token, session) pairs, read in a single query"""
+        with self._lock:
+            rows = self._conn.execute("SELECT token, data FROM sessions").fetchall()
+        return [(token, self._loads(data)) for token, data in rows]
+    
+    def values(self):
+        return [session_data for _, session_data in self.items()]
+    
+    def delete_expired(self, cutoff: float) -> int:
+        """Delete sessions idle since before cutoff; returns how many were removed"""
+        with self._lock:
+            return self._conn.execute("DELETE FROM sessions WHERE last_activity_ts < ?", (cutoff,)).rowcount
+
 
 class UserManager:
     """Manages user accounts, authentication, and sessions"""
     
-    def __init__(self, users_file: str = "backend/config/users.json", sessions_file: str = "backend/config/user_sessions.json"):
+    def __init__(self, users_file: str = "backend/config/users.json", sessions_file: str = "backend/config/user_sessions.json",
+                 flush_interval: float = 1.0, session_backend: str = "json"):
         self.users_file = users_file
         self.sessions_file = sessions_file
         self.users: Dict[str, Dict] = {}
+        # 'json' keeps sessions in memory and rewrites sessions_file behind;
+        # 'sqlite' stores them row-by-row in a database next to it
+        self._sessions_in_db = session_backend == "sqlite"
         self.sessions: Dict[str, Dict] = {}
         self.session_timeout = None  # Never expire sessions
         
+        # Secondary indexes over self.users, kept in sync by the mutators below
+        self._email_index: Dict[str, str] = {}  # lowercased email -> username
+        self._admin_count = 0  # active admin users
+        
+        # (last_activity_ts, token) min-heap for expiry; entries whose timestamp
+        # no longer matches the session are stale and skipped when popped
+        self._expiry_heap: List[tuple] = []
+        
+        # Write-behind persistence: mutations only mark the store dirty and a
+        # background thread writes it out at most once per flush_interval
+        self.flush_interval = flush_interval
+        self._users_dirty = False
+        self._sessions_dirty = False
+        self._touched_sessions: set = set()  # tokens whose ISO last_activity is stale
+        self._flush_lock = threading.Lock()
+        # Held by the mutators and by flush() while it snapshots, so the writer
+        # never iterates users/sessions/_touched_sessions while they change size
+        self._state_lock = threading.RLock()
+        self._stop_flushing = threading.Event()
+        self._flush_thread = threading.Thread(target=self._flush_loop, name="UserManagerFlush", daemon=True)
+        atexit.register(self.flush)
+        
         # Load existing users and sessions
         self._load_users()
         self._load_sessions()
@@ -30,58 +183,179 @@ class UserManager:
         
         # Clean expired sessions
         self._cleanup_expired_sessions()
+        
+        self._flush_thread.start()
     
     def _load_users(self):
         """Load users from file"""
         try:
             if os.path.exists(self.users_file):
-                with open(self.users_file, 'r', encoding='utf-8') as f:
-                    self.users = json.load(f)
+                self.users = self._read_json(self.users_file)
         except Exception as e:
             print(f"Error loading users: {e}")
             self.users = {}
+        self._rebuild_user_indexes()
+    
+    def _rebuild_user_indexes(self):
+        """Rebuild the email and admin-count indexes from self.users"""
+        self._email_index = {
+            user_data['email'].lower(): username
+            for username, user_data in self.users.items()
+            if user_data.get('email')
+        }
+        self._admin_count = sum(1 for user_data in self.users.values() if self._is_active_admin(user_data))
+    
+    @staticmethod
+    def _is_active_admin(user_data: Dict) -> bool:
+        return user_data.get('role') == 'admin' and user_data.get('is_active', True)
     
     def _save_users(self):
-        """Save users to file"""
-        try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(self.users_file), exist_ok=True)
-            with open(self.users_file, 'w', encoding='utf-8') as f:
-                json.dump(self.users, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving users: {e}")
+        """Mark users as modified; written to disk by the background flush"""
+        self._users_dirty = True
     
     def _load_sessions(self):
         """Load sessions from file"""
+        if self._sessions_in_db:
+            self.sessions = SqliteSessionStore(os.path.splitext(self.sessions_file)[0] + '.db')
+            return
+        
         try:
             if os.path.exists(self.sessions_file):
-                with open(self.sessions_file, 'r', encoding='utf-8') as f:
-                    self.sessions = json.load(f)
+                self.sessions = self._read_json(self.sessions_file)
         except Exception as e:
             print(f"Error loading sessions: {e}")
             self.sessions = {}
+        
+        # Sessions written before last_activity_ts existed only carry the ISO string
+        for session_data in self.sessions.values():
+            if 'last_activity_ts' not in session_data:
+                last_activity = session_data.get('last_activity') or '1970-01-01'
+                session_data['last_activity_ts'] = datetime.fromisoformat(last_activity).timestamp()
+        self._rebuild_expiry_heap()
+    
+    def _rebuild_expiry_heap(self):
+        """Rebuild the expiry heap from the live sessions, dropping stale entries"""
+        self._expiry_heap = [(session_data['last_activity_ts'], token) for token, session_data in self.sessions.items()]
+        heapq.heapify(self._expiry_heap)
+    
+    def _push_expiry(self, session_token: str, last_activity_ts: float):
+        """Record a session's new activity time in the expiry heap"""
+        if self._sessions_in_db:  # expiry is an indexed DELETE instead
+            return
+        heapq.heappush(self._expiry_heap, (last_activity_ts, session_token))
+        # Every refresh leaves a stale entry behind; compact once they dominate
+        if len(self._expiry_heap) > 2 * len(self.sessions) + 64:
+            self._rebuild_expiry_heap()
     
     def _save_sessions(self):
-        """Save sessions to file"""
+        """Mark sessions as modified; written to disk by the background flush"""
+        if not self._sessions_in_db:  # the database store writes through
+            self._sessions_dirty = True
+    
+    def _read_json(self, path: str) -> Dict:
+        """Read a JSON file"""
+        with open(path, 'rb') as f:
+            payload = f.read()
+        if HAS_ORJSON:
+            return orjson.loads(payload)
+        return json.loads(payload.decode('utf-8'))
+    
+    def _write_json(self, path: str, data: Dict):
+        """Atomically write data as indented JSON"""
+        if HAS_ORJSON:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        
+        # Ensure directory exists
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
         try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(self.sessions_file), exist_ok=True)
-            with open(self.sessions_file, 'w', encoding='utf-8') as f:
-                json.dump(self.sessions, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving sessions: {e}")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
     
-    def _hash_password(self, password: str, salt: str) -> str:
-        """Store password as plain text"""
-        return password
+    def flush(self):
+        """Write any pending user/session changes to disk"""
+        with self._flush_lock:
+            # Copy what needs writing under the state lock, then serialize without it
+            users = sessions = None
+            with self._state_lock:
+                if self._users_dirty:
+                    users = {username: dict(user_data) for username, user_data in self.users.items()}
+                    self._users_dirty = False
+                
+                if self._sessions_dirty:
+                    # last_activity is only stringified when it is actually persisted
+                    touched, self._touched_sessions = self._touched_sessions, set()
+                    for token in touched:
+                        session_data = self.sessions.get(token)
+                        if session_data is not None:
+                            session_data['last_activity'] = _iso_seconds(session_data['last_activity_ts'])
+                    sessions = {token: dict(session_data) for token, session_data in self.sessions.items()}
+                    self._sessions_dirty = False
+            
+            if users is not None:
+                try:
+                    self._write_json(self.users_file, users)
+                except Exception as e:
+                    self._users_dirty = True
+                    print(f"Error saving users: {e}")
+            
+            if sessions is not None:
+                try:
+                    self._write_json(self.sessions_file, sessions)
+                except Exception as e:
+                    self._sessions_dirty = True
+                    print(f"Error saving sessions: {e}")
+    
+    def _flush_loop(self):
+        """Background thread body: periodically flush dirty stores"""
+        while not self._stop_flushing.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # Keep the writer alive; the stores stay dirty and are retried
+                logger.exception("User store flush failed")
     
-    def _generate_salt(self) -> str:
-        """Generate a random salt"""
-        return secrets.token_hex(32)
+    def close(self):
+        """Stop the background writer and flush pending changes"""
+        self._stop_flushing.set()
+        self.flush()
+    
+    def _hash_password(self, password: str) -> str:
+        """Hash a password with scrypt and a fresh random salt"""
+        salt = secrets.token_bytes(_SALT_BYTES)
+        key = hashlib.scrypt(password.encode('utf-8'), salt=salt, **_SCRYPT_PARAMS)
+        return _PASSWORD_PREFIX + base64.b64encode(salt + key).decode('ascii')
+    
+    def _verify_password(self, user_data: Dict, password: str) -> bool:
+        """Check a password against a user record in constant time"""
+        stored = user_data.get('password_hash') or ''
+        
+        if not stored.startswith(_PASSWORD_PREFIX):
+            # Legacy plain-text record: verify, then upgrade it to a hash
+            if not hmac.compare_digest(password.encode('utf-8'), stored.encode('utf-8')):
+                return False
+            password_hash = self._hash_password(password)
+            with self._state_lock:
+                user_data['password_hash'] = password_hash
+                user_data['salt'] = ''
+                self._save_users()
+            return True
+        
+        raw = base64.b64decode(stored[len(_PASSWORD_PREFIX):])
+        salt, expected = raw[:_SALT_BYTES], raw[_SALT_BYTES:]
+        key = hashlib.scrypt(password.encode('utf-8'), salt=salt, **_SCRYPT_PARAMS)
+        return hmac.compare_digest(key, expected)
     
     def _generate_session_token(self) -> str:
-        """Generate a secure session token"""
-        return secrets.token_urlsafe(32)
+        """Generate a secure session token (256 bits, URL-safe base64)"""
+        return base64.urlsafe_b64encode(os.urandom(32)).rstrip(b'=').decode('ascii')
     
     def _create_default_admin(self):
         """Create default admin user"""
@@ -104,19 +378,25 @@ class UserManager:
         if self.session_timeout is None:
             return
             
-        current_time = datetime.now()
-        expired_sessions = []
-        
-        for session_token, session_data in self.sessions.items():
-            last_activity = datetime.fromisoformat(session_data.get('last_activity', '1970-01-01'))
-            if (current_time - last_activity).total_seconds() > self.session_timeout:
-                expired_sessions.append(session_token)
-        
-        for session_token in expired_sessions:
-            del self.sessions[session_token]
+        cutoff = time.time() - self.session_timeout
+        if self._sessions_in_db:
+            self.sessions.delete_expired(cutoff)
+            return
         
-        if expired_sessions:
-            self._save_sessions()
+        with self._state_lock:
+            heap = self._expiry_heap
+            expired = False
+            
+            # Only the sessions idle past the cutoff are visited
+            while heap and heap[0][0] < cutoff:
+                last_activity_ts, session_token = heapq.heappop(heap)
+                session_data = self.sessions.get(session_token)
+                if session_data is not None and session_data['last_activity_ts'] == last_activity_ts:
+                    del self.sessions[session_token]
+                    expired = True
+            
+            if expired:
+                self._save_sessions()
     
     def create_user(self, username: str, password: str, email: str, role: str = "user", 
                    display_name: str = None) -> bool:
@@ -125,19 +405,19 @@ class UserManager:
             return False
         
         # Check for duplicate email
-        for user_data in self.users.values():
-            if user_data.get('email', '').lower() == email.lower():
-                return False
+        email_key = email.lower()
+        if email_key in self._email_index:
+            return False
         
-        self.users[username] = {
+        user_data = {
             'user_id': username,  # Use username as natural language identifier
             'username': username,
             'email': email,
-            'password_hash': password,  # Store as plain text
-            'salt': '',  # No salt needed for plain text
+            'password_hash': self._hash_password(password),
+            'salt': '',  # Salt is embedded in password_hash
             'role': role,  # 'admin', 'user'
             'display_name': display_name or username,
-            'created_at': datetime.now().isoformat(),
+            'created_at': _now_iso(),
             'last_login': None,
             'is_active': True,
             'settings': {
@@ -147,7 +427,16 @@ class UserManager:
             }
         }
         
-        self._save_users()
+        with self._state_lock:
+            # Re-check: the hash above runs without the lock
+            if username in self.users or email_key in self._email_index:
+                return False
+            self.users[username] = user_data
+            if email_key:
+                self._email_index[email_key] = username
+            if self._is_active_admin(user_data):
+                self._admin_count += 1
+            self._save_users()
         return True
     
     def authenticate_user(self, username: str, password: str) -> Optional[Dict]:
@@ -159,13 +448,13 @@ class UserManager:
         if not user_data.get('is_active', True):
             return None
         
-        # Verify password (plain text comparison)
-        if password != user_data['password_hash']:
+        if not self._verify_password(user_data, password):
             return None
         
         # Update last login
-        user_data['last_login'] = datetime.now().isoformat()
-        self._save_users()
+        with self._state_lock:
+            user_data['last_login'] = _now_iso()
+            self._save_users()
         
         return {
             'user_id': user_data['user_id'],
@@ -178,47 +467,60 @@ class UserManager:
     def create_session(self, user_data: Dict) -> str:
         """Create a new user session"""
         session_token = self._generate_session_token()
+        now = time.time()
+        created_at = _iso_seconds(now)
         
-        self.sessions[session_token] = {
-            'user_id': user_data['user_id'],
-            'username': user_data['username'],
-            'role': user_data['role'],
-            'created_at': datetime.now().isoformat(),
-            'last_activity': datetime.now().isoformat(),
-            'ip_address': None,  # Can be set by the calling code
-            'user_agent': None   # Can be set by the calling code
-        }
-        
-        self._save_sessions()
+        with self._state_lock:
+            self.sessions[session_token] = {
+                'user_id': user_data['user_id'],
+                'username': user_data['username'],
+                'role': user_data['role'],
+                'created_at': created_at,
+                'last_activity': created_at,
+                'last_activity_ts': now,
+                'ip_address': None,  # Can be set by the calling code
+                'user_agent': None   # Can be set by the calling code
+            }
+            self._push_expiry(session_token, now)
+            self._save_sessions()
         return session_token
     
     def validate_session(self, session_token: str) -> Optional[Dict]:
         """Validate and refresh a session token"""
-        if session_token not in self.sessions:
+        session_data = self.sessions.get(session_token)
+        if session_data is None:
             return None
         
-        session_data = self.sessions[session_token]
+        now = time.time()
         
         # Check if session is expired (only if timeout is set)
         if self.session_timeout is not None:
-            last_activity = datetime.fromisoformat(session_data['last_activity'])
-            if (datetime.now() - last_activity).total_seconds() > self.session_timeout:
-                del self.sessions[session_token]
-                self._save_sessions()
+            if now - session_data['last_activity_ts'] > self.session_timeout:
+                with self._state_lock:
+                    self.sessions.pop(session_token, None)
+                    self._save_sessions()
                 return None
         
-        # Update last activity
-        session_data['last_activity'] = datetime.now().isoformat()
-        self._save_sessions()
+        # Update last activity (the ISO string is refreshed on flush)
+        session_data['last_activity_ts'] = now
+        if self._sessions_in_db:
+            session_data['last_activity'] = _iso_seconds(now)
+            self.sessions[session_token] = session_data
+        else:
+            with self._state_lock:
+                self._push_expiry(session_token, now)
+                self._touched_sessions.add(session_token)
+                self._save_sessions()
         
         return session_data
     
     def logout_session(self, session_token: str) -> bool:
         """Logout and remove session"""
-        if session_token in self.sessions:
-            del self.sessions[session_token]
-            self._save_sessions()
-            return True
+        with self._state_lock:
+            if session_token in self.sessions:
+                del self.sessions[session_token]
+                self._save_sessions()
+                return True
         return False
     
     def get_user_by_id(self, user_id: str) -> Optional[Dict]:
@@ -241,18 +543,27 @@ class UserManager:
     
     def update_user(self, username: str, updates: Dict) -> bool:
         """Update user information"""
-        if username not in self.users:
-            return False
-        
-        user_data = self.users[username]
-        
-        # Update allowed fields
-        allowed_fields = ['email', 'role', 'display_name', 'is_active', 'settings']
-        for field, value in updates.items():
-            if field in allowed_fields:
-                user_data[field] = value
-        
-        self._save_users()
+        with self._state_lock:
+            user_data = self.users.get(username)
+            if user_data is None:
+                return False
+            was_admin = self._is_active_admin(user_data)
+            
+            # Update allowed fields
+            allowed_fields = ['email', 'role', 'display_name', 'is_active', 'settings']
+            for field, value in updates.items():
+                if field in allowed_fields:
+                    if field == 'email':
+                        old_email = (user_data.get('email') or '').lower()
+                        if self._email_index.get(old_email) == username:
+                            del self._email_index[old_email]
+                        if value:
+                            self._email_index[value.lower()] = username
+                    user_data[field] = value
+            
+            self._admin_count += self._is_active_admin(user_data) - was_admin
+            
+            self._save_users()
         return True
     
     def change_password(self, username: str, old_password: str, new_password: str) -> bool:
@@ -262,14 +573,14 @@ class UserManager:
         
         user_data = self.users[username]
         
-        # Verify old password (plain text comparison)
-        if old_password != user_data['password_hash']:
+        if not self._verify_password(user_data, old_password):
             return False
         
-        # Set new password (plain text)
-        user_data['password_hash'] = new_password
-        
-        self._save_users()
+        password_hash = self._hash_password(new_password)
+        with self._state_lock:
+            user_data['password_hash'] = password_hash
+            user_data['salt'] = ''
+            self._save_users()
         return True
     
     def reset_password(self, username: str, new_password: str) -> bool:
@@ -278,36 +589,40 @@ class UserManager:
             return False
         
         user_data = self.users[username]
-        
-        # Set new password (plain text)
-        user_data['password_hash'] = new_password
-        
-        self._save_users()
+        password_hash = self._hash_password(new_password)
+        with self._state_lock:
+            user_data['password_hash'] = password_hash
+            user_data['salt'] = ''
+            self._save_users()
         return True
     
     def delete_user(self, username: str) -> bool:
         """Delete user account"""
-        if username not in self.users:
-            return False
-        
-        # Don't allow deleting the last admin user
-        admin_count = sum(1 for user in self.users.values() 
-                         if user.get('role') == 'admin' and user.get('is_active', True))
-        
-        if self.users[username].get('role') == 'admin' and admin_count <= 1:
-            return False
-        
-        del self.users[username]
-        self._save_users()
-        
-        # Remove all sessions for this user (using username as user_id)
-        sessions_to_remove = [
-            token for token, session in self.sessions.items()
-            if session['user_id'] == username
-        ]
-        for token in sessions_to_remove:
-            del self.sessions[token]
-        self._save_sessions()
+        with self._state_lock:
+            user_data = self.users.get(username)
+            if user_data is None:
+                return False
+            
+            # Don't allow deleting the last admin user
+            if user_data.get('role') == 'admin' and self._admin_count <= 1:
+                return False
+            
+            del self.users[username]
+            email_key = (user_data.get('email') or '').lower()
+            if self._email_index.get(email_key) == username:
+                del self._email_index[email_key]
+            if self._is_active_admin(user_data):
+                self._admin_count -= 1
+            self._save_users()
+            
+            # Remove all sessions for this user (using username as user_id)
+            sessions_to_remove = [
+                token for token, session in self.sessions.items()
+                if session['user_id'] == username
+            ]
+            for token in sessions_to_remove:
+                del self.sessions[token]
+            self._save_sessions()
         
         return True
     
@@ -331,31 +646,45 @@ class UserManager:
         
         return sorted(users, key=lambda x: x['created_at'])
     
+    def _user_display(self, user_id: str) -> Optional[tuple]:
+        """Return (username, display_name) for a user, or None if unknown"""
+        user_data = self.users.get(user_id)
+        if user_data is None:
+            return None
+        return user_data['username'], user_data['display_name']
+    
     def get_active_sessions(self) -> List[Dict]:
         """Get all active sessions"""
         self._cleanup_expired_sessions()
-        sessions = []
         
-        for token, session_data in self.sessions.items():
-            user_data = self.get_user_by_id(session_data['user_id'])
-            if user_data:
+        # Sort on the numeric timestamp and only format the rows that are returned
+        active = sorted(
+            self.sessions.items(),
+            key=lambda item: item[1]['last_activity_ts'],
+            reverse=True
+        )
+        
+        sessions = []
+        for token, session_data in active:
+            display = self._user_display(session_data['user_id'])
+            if display:
+                username, display_name = display
                 sessions.append({
                     'session_token': token[:8] + '...',  # Partial token for security
-                    'username': user_data['username'],
-                    'display_name': user_data['display_name'],
+                    'username': username,
+                    'display_name': display_name,
                     'created_at': session_data['created_at'],
-                    'last_activity': session_data['last_activity'],
+                    'last_activity': _iso_seconds(session_data['last_activity_ts']),
                     'ip_address': session_data.get('ip_address', 'Unknown')
                 })
         
-        return sorted(sessions, key=lambda x: x['last_activity'], reverse=True)
+        return sessions
     
     def get_user_stats(self) -> Dict[str, Any]:
         """Get user management statistics"""
         total_users = len(self.users)
         active_users = sum(1 for user in self.users.values() if user.get('is_active', True))
-        admin_users = sum(1 for user in self.users.values() 
-                         if user.get('role') == 'admin' and user.get('is_active', True))
+        admin_users = self._admin_count
         
         self._cleanup_expired_sessions()
         active_sessions = len(self.sessions)
@@ -0,0 +1,152 @@
+# cython: language_level=3
+"""
+Compiled BFS kernel for NumericSummaryTool.
+
+Mirrors numeric_summary._bfs_collect with typed locals. Build in place with
+
+    cythonize -i -3 backend/services/agents/tools/_numeric_summary_cy.pyx
+
+(optionally with CFLAGS="-O3"); the resulting extension module is picked up
+by numeric_summary.py automatically and the pure-Python walk is used otherwise.
+"""
+
+cimport cython
+from collections import deque
+
+from backend.services.agents.tools.numeric_summary import _format_number, _summarize_entries
+
+cdef tuple _IDENTIFIER_KEYS = ("id", "ID", "Id", "identifier", "name", "key", "title")
+
+
+cdef inline bint _is_number(object value):
+    cdef type cls = type(value)
+    if cls is int or cls is float:
+        return True
+    return cls is not bool and isinstance(value, (int, float))
+
+
+cdef inline bint _is_leaf(object value):
+    return value is None or isinstance(value, (str, bytes, bool))
+
+
+cdef object _record_identifier(dict item):
+    cdef object identifier_key, value
+    for identifier_key in _IDENTIFIER_KEYS:
+        if identifier_key in item:
+            value = item[identifier_key]
+            if _is_number(value):
+                return _format_number(value)
+            if isinstance(value, str):
+                return value
+    return None
+
+
+cdef inline int _add_stat(dict sections, str path, list entries, int max_sections,
+                          object item_prefix=None, str item_suffix="") except -1:
+    cdef str canonical_path
+    if not entries or len(sections) >= max_sections:
+        return 0
+
+    canonical_path = path or "$"
+    if canonical_path in sections:
+        return 0
+
+    sections[canonical_path] = _summarize_entries(canonical_path, entries, item_prefix, item_suffix)
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef list _bfs_collect(object data, int max_sections, int max_child_items, bint prune_non_numeric=True):
+    cdef dict sections = {}
+    cdef dict seen_keys
+    cdef object queue = deque([(data, None, None, False)])
+    cdef Py_ssize_t visited = 0
+    cdef Py_ssize_t max_iterations = 10000
+    cdef Py_ssize_t idx
+    cdef bint has_dicts
+    cdef object current, parent, value, item, key
+    cdef str path
+    cdef bint is_index
+    cdef list current_list, numeric_entries, keys, identifiers
+
+    while queue and len(sections) < max_sections and visited < max_iterations:
+        current, parent, key, is_index = queue.popleft()
+        visited += 1
+
+        if parent is None:
+            path = "$"
+        elif is_index:
+            path = f"{parent}[{key}]"
+        else:
+            path = f"{parent}.{key}"
+
+        if _is_number(current):
+            if "[]." not in path and "[" in path and path.endswith("]"):
+                continue
+            _add_stat(sections, path, [{"value": current, "path": path, "id": None}], max_sections)
+            continue
+
+        if isinstance(current, dict):
+            # Typed dict iteration compiles down to PyDict_Next
+            for key, value in (<dict>current).items():
+                if prune_non_numeric and _is_leaf(value):
+                    continue
+                queue.append((value, path, key, False))
+
+        elif isinstance(current, list):
+            current_list = <list>current
+            numeric_entries = []
+            for idx in range(len(current_list)):
+                item = current_list[idx]
+                if _is_number(item):
+                    numeric_entries.append({"value": item, "path": idx, "id": None})
+            _add_stat(sections, path, numeric_entries, max_sections, path)
+
+            has_dicts = False
+            for item in current_list:
+                if isinstance(item, dict):
+                    has_dicts = True
+                    break
+
+            if has_dicts:
+                # Ordered union of the sampled records' keys
+                seen_keys = {}
+                for item in current_list[:max_child_items]:
+                    if isinstance(item, dict):
+                        seen_keys.update(dict.fromkeys(<dict>item))
+                keys = list(seen_keys)
+
+                identifiers = []
+                if keys:
+                    for item in current_list:
+                        identifiers.append(_record_identifier(<dict>item) if isinstance(item, dict) else None)
+
+                for key in keys:
+                    numeric_entries = []
+                    for idx in range(len(current_list)):
+                        item = current_list[idx]
+                        if not isinstance(item, dict):
+                            continue
+                        value = (<dict>item).get(key)
+                        if not _is_number(value):
+                            continue
+
+                        numeric_entries.append({
+                            "value": value,
+                            "path": idx,
+                            "id": identifiers[idx],
+                        })
+
+                    _add_stat(sections, f"{path}[].{key}", numeric_entries, max_sections,
+                              path, f".{key}")
+                    if len(sections) >= max_sections:
+                        break
+
+            for idx, value in enumerate(current_list[:max_child_items]):
+                if prune_non_numeric and _is_leaf(value):
+                    continue
+                queue.append((value, path, idx, True))
+
+    return list(sections.values())
+
@@ -2,8 +2,53 @@
 
 from backend.services.agents.tools.base import BaseTool
 from backend.utils.exceptions import ToolExecutionError
+import math
 import statistics
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Below this many values the statistics module beats the cost of building an array
+NUMPY_THRESHOLD = 64
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Linearly interpolated percentile (same convention as numpy.percentile)."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+# operation -> (statistics-based implementation, NumPy implementation); each takes (values, q)
+_OPERATIONS: Dict[str, Tuple[Callable[[Any, float], float], Optional[Callable[[Any, float], float]]]] = {
+    "sum": (lambda v, q: math.fsum(v), None),
+    "mean": (lambda v, q: statistics.mean(v), None),
+    "median": (lambda v, q: statistics.median(v), None),
+    "std_dev": (lambda v, q: statistics.stdev(v) if len(v) > 1 else 0, None),
+    "var": (lambda v, q: statistics.variance(v) if len(v) > 1 else 0, None),
+    "min": (lambda v, q: min(v), None),
+    "max": (lambda v, q: max(v), None),
+    "percentile": (_percentile, None),
+}
+
+if HAS_NUMPY:
+    _NUMPY_OPERATIONS = {
+        "sum": lambda a, q: a.sum(),
+        "mean": lambda a, q: a.mean(),
+        "median": lambda a, q: np.median(a),
+        "std_dev": lambda a, q: a.std(ddof=1),
+        "var": lambda a, q: a.var(ddof=1),
+        "min": lambda a, q: a.min(),
+        "max": lambda a, q: a.max(),
+        "percentile": lambda a, q: np.percentile(a, q),
+    }
+    _OPERATIONS = {op: (small, _NUMPY_OPERATIONS[op]) for op, (small, _) in _OPERATIONS.items()}
 
 
 class CalculatorTool(BaseTool):
@@ -21,23 +66,24 @@ class CalculatorTool(BaseTool):
     def parameters_description(self) -> str:
         return """
 Parameters:
-  - operation (str): Operation to perform (add, subtract, multiply, divide, mean, median, sum, etc.)
+  - operation (str): Operation to perform (sum, mean, median, std_dev, var, min, max, percentile)
   - values (list): List of numbers to operate on
+  - q (float): Percentile to compute for the percentile operation (default: 50)
 """
 
     def execute(self, operation: str, values: List[float], **kwargs) -> Dict[str, Any]:
         """Execute calculation."""
         try:
-            if operation == "sum":
-                result = sum(values)
-            elif operation == "mean":
-                result = statistics.mean(values)
-            elif operation == "median":
-                result = statistics.median(values)
-            elif operation == "std_dev":
-                result = statistics.stdev(values) if len(values) > 1 else 0
+            small_fn, numpy_fn = _OPERATIONS[operation]
+        except KeyError:
+            raise ToolExecutionError(f"Unknown operation: {operation}") from None
+
+        q = kwargs.get("q", 50)
+        try:
+            if numpy_fn is not None and len(values) >= NUMPY_THRESHOLD:
+                result = float(numpy_fn(np.asarray(values, dtype=np.float64), q))
             else:
-                raise ToolExecutionError(f"Unknown operation: {operation}")
+                result = small_fn(values, q)
 
             return {"success": True, "result": result, "operation": operation, "count": len(values)}
 
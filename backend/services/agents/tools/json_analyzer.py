@@ -1,7 +1,7 @@
 """JSON Analyzer Tool - Main entry point for JSON analysis."""
 
 from backend.services.agents.tools.base import BaseTool
-from backend.utils.json_utils import get_json_statistics, extract_numeric_fields
+from backend.utils.json_utils import analyze_json, analyze_json_stream
 from typing import Any, Dict
 
 
@@ -20,24 +20,28 @@ class JSONAnalyzerTool(BaseTool):
     def parameters_description(self) -> str:
         return """
 Parameters:
-  - json_data (dict|list): JSON data to analyze
-  - analysis_type (str): Type of analysis (structure, fields, summary)
+  - json_data (dict|list|path|file): JSON data to analyze (a path or binary file when stream=True)
+  - analysis_type (str): Type of analysis: structure, fields, overview (structure and fields together) or summary (the data as given)
+  - stream (bool): Parse incrementally with ijson instead of loading the document (default: False)
 """
 
-    def execute(self, json_data: Any, analysis_type: str = "structure", **kwargs) -> Dict[str, Any]:
+    def execute(self, json_data: Any, analysis_type: str = "structure", stream: bool = False, **kwargs) -> Dict[str, Any]:
         """Execute JSON analysis."""
+        if analysis_type not in ("structure", "fields", "overview"):
+            return {"success": True, "analysis_type": analysis_type, "data": json_data}
+
+        # Structure and numeric fields come out of a single traversal
+        analyze = analyze_json_stream if stream else analyze_json
+        stats, numeric_fields = analyze(json_data, collect_numeric=analysis_type != "structure")
+
         if analysis_type == "structure":
-            stats = get_json_statistics(json_data)
             return {"success": True, "analysis_type": "structure", **stats}
 
-        elif analysis_type == "fields":
-            numeric_fields = extract_numeric_fields(json_data)
-            return {
-                "success": True,
-                "analysis_type": "fields",
-                "numeric_fields": list(numeric_fields.keys()),
-                "field_count": len(numeric_fields)
-            }
+        fields = {
+            "numeric_fields": list(numeric_fields.keys()),
+            "field_count": len(numeric_fields)
+        }
+        if analysis_type == "fields":
+            return {"success": True, "analysis_type": "fields", **fields}
 
-        else:
-            return {"success": True, "analysis_type": analysis_type, "data": json_data}
+        return {"success": True, "analysis_type": "overview", **stats, **fields}
@@ -7,13 +7,424 @@ Refactored from backend/app/routes/chat.py::_generate_numeric_summary
 
 from __future__ import annotations
 
+import hashlib
+import json
+import re
 import statistics
-from collections import deque
-from typing import Any, Dict, List
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Union
 
 from backend.services.agents.tools.base import BaseTool
 from backend.utils.exceptions import ToolExecutionError
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import msgspec
+    HAS_MSGSPEC = True
+except ImportError:
+    HAS_MSGSPEC = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Sections with at least this many values are reduced with NumPy
+NUMPY_THRESHOLD = 64
+
+# Keys whose values label min/max entries in lists of records
+_IDENTIFIER_KEYS = ("id", "ID", "Id", "identifier", "name", "key", "title")
+
+
+def _numpy_reduce(values: List[Any]):
+    """
+    Return (min index, max index, sum, mean, median) via NumPy, or None.
+
+    Results keep the types the statistics module would produce (ints stay
+    ints where exact) so formatted summaries do not change.
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind not in "if":
+        return None
+
+    count = arr.size
+    imin = int(arr.argmin())
+    imax = int(arr.argmax())
+
+    if arr.dtype.kind == "i":
+        # int64 accumulation must not overflow; Python ints are unbounded
+        bound = max(abs(int(arr[imin])), abs(int(arr[imax])))
+        total = arr.sum().item() if bound * count < 2 ** 63 else sum(values)
+        mean = total // count if total % count == 0 else total / count
+    else:
+        total = arr.sum().item()
+        mean = arr.mean().item()
+
+    # O(n) selection of the middle element(s); the median is then taken from the
+    # original values exactly as statistics.median would compute it
+    mid = count // 2
+    if count % 2:
+        median = values[int(np.argpartition(arr, mid)[mid])]
+    else:
+        order = np.argpartition(arr, (mid - 1, mid))
+        median = (values[int(order[mid - 1])] + values[int(order[mid])]) / 2
+
+    return imin, imax, total, mean, median
+
+
+_NUMERIC_TYPES = frozenset((int, float))
+
+
+def _is_number(value) -> bool:
+    # Exact int/float hit the set lookup; subclasses (numpy.float64, IntEnum)
+    # still count via isinstance, bool never does
+    cls = type(value)
+    return cls in _NUMERIC_TYPES or (cls is not bool and isinstance(value, (int, float)))
+
+
+def _format_float(value) -> str:
+    return f"{value:.6g}"
+
+
+# Exact-type dispatch for the common cases; subclasses take the isinstance path
+_FORMATTERS = {int: str, float: _format_float}
+if HAS_NUMPY:
+    _FORMATTERS[np.float64] = _format_float
+
+
+def _format_number(value):
+    formatter = _FORMATTERS.get(type(value))
+    if formatter is not None:
+        return formatter(value)
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return str(value)
+
+
+def _record_identifier(item: Dict[str, Any]) -> Optional[str]:
+    """Label for a record: its first identifier-like key holding a number or string."""
+    for identifier_key in _IDENTIFIER_KEYS:
+        if identifier_key in item:
+            value = item[identifier_key]
+            if _is_number(value):
+                return _format_number(value)
+            if isinstance(value, str):
+                return value
+    return None
+
+
+def _summarize_entries(
+    path: str,
+    entries: List[Dict[str, Any]],
+    item_prefix: Optional[str] = None,
+    item_suffix: str = ""
+) -> Dict[str, Any]:
+    """
+    Build one stat section from the collected numeric entries.
+
+    When item_prefix is given, entry "path" values are list indices and only
+    the min/max locations are formatted, as ``{item_prefix}[{index}]{item_suffix}``.
+    """
+    values = [entry["value"] for entry in entries]
+    reduced = _numpy_reduce(values) if HAS_NUMPY and len(values) >= NUMPY_THRESHOLD else None
+
+    if reduced is not None:
+        imin, imax, total, mean, median = reduced
+        min_entry = entries[imin]
+        max_entry = entries[imax]
+    else:
+        # Extrema, sum and int-ness in one pass; ties keep the first entry like min()/max()
+        imin = imax = 0
+        low = high = values[0]
+        total = 0
+        all_ints = True
+        for idx, value in enumerate(values):
+            total += value
+            if value < low:
+                low, imin = value, idx
+            elif value > high:
+                high, imax = value, idx
+            if all_ints and not isinstance(value, int):
+                all_ints = False
+
+        count = len(values)
+        # Same result types as statistics.mean: exact int means stay ints
+        mean = total // count if all_ints and total % count == 0 else total / count
+        median = statistics.median(values)
+        min_entry = entries[imin]
+        max_entry = entries[imax]
+
+    min_path = min_entry.get("path")
+    max_path = max_entry.get("path")
+    if item_prefix is not None:
+        min_path = f"{item_prefix}[{min_path}]{item_suffix}"
+        max_path = f"{item_prefix}[{max_path}]{item_suffix}"
+
+    return {
+        "path": path,
+        "count": len(values),
+        "min": min_entry["value"],
+        "max": max_entry["value"],
+        "min_path": min_path,
+        "max_path": max_path,
+        "min_id": min_entry.get("id"),
+        "max_id": max_entry.get("id"),
+        "sum": total,
+        "mean": mean,
+        "median": median,
+    }
+
+
+def _view_type(value: Any, record: bool = False):
+    """msgspec type for the numeric-bearing part of ``value``, or None if there is none."""
+    if _is_number(value):
+        return Union[int, float, None]
+
+    if isinstance(value, dict):
+        fields = []
+        rename = {}
+        for key, child in value.items():
+            if record and key in _IDENTIFIER_KEYS:
+                child_type = Any
+            else:
+                child_type = _view_type(child)
+                if child_type is None:
+                    continue
+            name = f"f{len(fields)}"
+            rename[name] = key
+            fields.append((name, Optional[child_type], None))
+        if not fields:
+            return None
+        return msgspec.defstruct("NumericView", fields, rename=rename, omit_defaults=True)
+
+    if isinstance(value, list):
+        if value and all(_is_number(item) for item in value):
+            return List[Union[int, float]]
+        if value and all(isinstance(item, dict) for item in value):
+            merged = {}
+            for item in value:
+                for key, child in item.items():
+                    if key not in merged or _view_type(merged[key]) is None:
+                        merged[key] = child
+            item_type = _view_type(merged, record=True)
+            return List[item_type] if item_type is not None else None
+        # Mixed lists are kept whole rather than guessing a shape
+        return Any if any(not isinstance(item, (str, bool)) and item is not None for item in value) else None
+
+    return None
+
+
+def numeric_view_schema(sample: Any):
+    """
+    Build a msgspec schema that keeps only the numeric-bearing fields of ``sample``.
+
+    Pass the result as ``schema`` to NumericSummaryTool.execute with raw JSON
+    documents shaped like the sample; the decoder then skips everything the
+    summary never reads. Returns None when msgspec is unavailable.
+    """
+    if not HAS_MSGSPEC:
+        return None
+    return _view_type(sample) or Any
+
+
+def _decode_json(raw: Union[str, bytes], schema: Any = None) -> Any:
+    """Decode raw JSON, through a msgspec view when a schema is given."""
+    if schema is not None and HAS_MSGSPEC:
+        try:
+            return msgspec.to_builtins(msgspec.json.decode(raw, type=schema))
+        except msgspec.ValidationError:
+            pass  # document does not fit the view; decode it in full
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # NaN/Infinity literals and >64-bit ints are json-only
+    return json.loads(raw)
+
+
+def _bfs_collect(
+    data: Any,
+    max_sections: int,
+    max_child_items: int,
+    prune_non_numeric: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Walk the JSON tree breadth-first and collect numeric stat sections.
+
+    With prune_non_numeric, string/bytes/bool/None children are never queued:
+    they cannot yield a section, and skipping them keeps the walk's
+    iteration budget for nodes that can.
+
+    Child paths are formatted when a node is dequeued, not when it is queued,
+    and per-item entry paths only for a section's extrema.
+
+    A compiled version lives in _numeric_summary_cy.pyx and replaces this one
+    when it has been built in place with
+    ``cythonize -i backend/services/agents/tools/_numeric_summary_cy.pyx``.
+    """
+    # Canonical path -> section; the path key doubles as the dedup check
+    sections: Dict[str, Dict[str, Any]] = {}
+    # (value, parent path, key or index, is_index); the root has no parent
+    queue = deque([(data, None, None, False)])
+    visited = 0
+    max_iterations = 10000
+
+    def add_stat(path: str, entries, item_prefix=None, item_suffix=""):
+        if not entries or len(sections) >= max_sections:
+            return
+
+        canonical_path = path or "$"
+        if canonical_path in sections:
+            return
+
+        sections[canonical_path] = _summarize_entries(canonical_path, entries, item_prefix, item_suffix)
+
+    while queue and len(sections) < max_sections and visited < max_iterations:
+        current, parent, key, is_index = queue.popleft()
+        visited += 1
+
+        if parent is None:
+            path = "$"
+        elif is_index:
+            path = f"{parent}[{key}]"
+        else:
+            path = f"{parent}.{key}"
+
+        if _is_number(current):
+            if "[]." not in path and "[" in path and path.endswith("]"):
+                continue
+            add_stat(path, [{"value": current, "path": path, "id": None}])
+            continue
+
+        if isinstance(current, dict):
+            for key, value in current.items():
+                if prune_non_numeric and (value is None or isinstance(value, (str, bytes, bool))):
+                    continue
+                queue.append((value, path, key, False))
+
+        elif isinstance(current, list):
+            numeric_entries = [
+                {"value": item, "path": idx, "id": None}
+                for idx, item in enumerate(current)
+                if _is_number(item)
+            ]
+            add_stat(path, numeric_entries, path)
+
+            if any(isinstance(item, dict) for item in current):
+                # Ordered union of the sampled records' keys
+                seen_keys = {}
+                for item in current[:max_child_items]:
+                    if isinstance(item, dict):
+                        seen_keys.update(dict.fromkeys(item))
+                keys = list(seen_keys)
+
+                # Resolved once per record, not once per record per numeric key
+                identifiers = [
+                    _record_identifier(item) if isinstance(item, dict) else None
+                    for item in current
+                ] if keys else []
+
+                for key in keys:
+                    numeric_entries = []
+                    for idx, item in enumerate(current):
+                        if not isinstance(item, dict):
+                            continue
+                        value = item.get(key)
+                        if not _is_number(value):
+                            continue
+
+                        numeric_entries.append({
+                            "value": value,
+                            "path": idx,
+                            "id": identifiers[idx],
+                        })
+
+                    add_stat(f"{path}[].{key}", numeric_entries, path, f".{key}")
+                    if len(sections) >= max_sections:
+                        break
+
+            for idx, value in enumerate(current[:max_child_items]):
+                if prune_non_numeric and (value is None or isinstance(value, (str, bytes, bool))):
+                    continue
+                queue.append((value, path, idx, True))
+
+    return list(sections.values())
+
+
+# One line of _format_stats output; anything else goes through _parse_stat_line
+_STAT_LINE_RE = re.compile(
+    r"- (?P<path>.*?): n=(?P<n>\d+), sum=(?P<sum>[^ ,]+), "
+    r"min=(?P<min>[^ ,]+)(?: @[^,]*)?, max=(?P<max>[^ ,]+)(?: @[^,]*)?, "
+    r"mean=(?P<mean>[^ ,]+), median=(?P<median>[^ ,]+)$"
+)
+
+
+def _parse_stat_line(line: str) -> Optional[Dict[str, Any]]:
+    """Lenient parse of a "- $.path: n=X, sum=Y, ..." line (any subset of fields)."""
+    parts = line[2:].split(": ", 1)
+    if len(parts) != 2:
+        return None
+
+    path = parts[0]
+    values_str = parts[1]
+
+    stat = {"path": path}
+
+    # Parse key=value pairs
+    for pair in values_str.split(", "):
+        if "=" in pair:
+            key, value = pair.split("=", 1)
+            # Remove location info from values
+            value = value.split(" @")[0]
+
+            # Convert to appropriate type
+            try:
+                if key == "n":
+                    stat["count"] = int(value)
+                elif key in ["sum", "min", "max", "mean", "median"]:
+                    stat[key] = float(value)
+            except ValueError:
+                pass
+
+    return stat if len(stat) > 1 else None  # More than just the path
+
+
+def _fingerprint(data: Any) -> Optional[bytes]:
+    """Digest of a document's content and key order, or None if it cannot be serialized."""
+    if isinstance(data, str):
+        raw = b"s" + data.encode("utf-8", "surrogatepass")
+    elif isinstance(data, (bytes, bytearray)):
+        raw = b"b" + bytes(data)
+    else:
+        try:
+            if HAS_ORJSON:
+                raw = b"o" + orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+            else:
+                raw = b"o" + json.dumps(data).encode("utf-8")
+        except (TypeError, ValueError):
+            return None
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {**result, "statistics": [dict(stat) for stat in result["statistics"]]}
+
+
+# The pure-Python walker stays reachable, e.g. to check the compiled one against it
+_bfs_collect_py = _bfs_collect
+
+try:
+    from backend.services.agents.tools._numeric_summary_cy import _bfs_collect  # noqa: F811
+except ImportError:
+    pass
+
 
 class NumericSummaryTool(BaseTool):
     """
@@ -24,8 +435,17 @@ class NumericSummaryTool(BaseTool):
     - Identifies location of extrema with IDs
     - Automatic path detection
     - Handles nested structures
+
+    Results are memoized per instance on a digest of the input and the
+    summary options, so repeated calls on the same data skip the walk.
     """
 
+    RESULT_CACHE_SIZE = 32
+
+    def __init__(self):
+        self._cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
     @property
     def name(self) -> str:
         return "numeric_summary"
@@ -40,9 +460,12 @@ Identifies locations of extrema with IDs if available."""
     def parameters_description(self) -> str:
         return """
 Parameters:
-  - json_data (dict|list): JSON data to analyze
+  - json_data (dict|list|str|bytes): JSON data to analyze, or raw JSON text
   - max_sections (int): Maximum number of stat sections (default: 12)
   - max_child_items (int): Maximum child items to process (default: 25)
+  - prune_non_numeric (bool): Skip string/bool/null values while walking (default: True)
+  - include_text (bool): Render summary_text; False returns statistics only (default: True)
+  - schema (optional): msgspec view from numeric_view_schema() for decoding raw JSON text
 """
 
     @property
@@ -59,29 +482,50 @@ Parameters:
         json_data: Any,
         max_sections: int = 12,
         max_child_items: int = 25,
+        schema: Any = None,
+        prune_non_numeric: bool = True,
+        include_text: bool = True,
         **kwargs
     ) -> Dict[str, Any]:
         """
         Generate numeric summary.
 
         Args:
-            json_data: JSON data structure
+            json_data: JSON data structure, or raw JSON text (decoded with orjson when available)
             max_sections: Maximum stat sections to generate
             max_child_items: Maximum child items per section
+            schema: Optional msgspec view (see numeric_view_schema) used to
+                decode raw JSON text without materializing non-numeric fields
+            prune_non_numeric: Skip pushing string/bool/None values during the walk
+            include_text: Render summary_text; when False only structured
+                statistics are produced and summary_text is ""
 
         Returns:
             Dictionary with statistics and formatted summary
         """
+        cache_key = None
+        fingerprint = _fingerprint(json_data)
+        if fingerprint is not None:
+            cache_key = (fingerprint, max_sections, max_child_items, prune_non_numeric, include_text, schema)
+            with self._cache_lock:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    self._cache.move_to_end(cache_key)
+                    return _copy_result(cached)
+
         try:
-            summary_text = self._generate_summary(
-                json_data,
-                max_sections,
-                max_child_items
-            )
+            if isinstance(json_data, (str, bytes, bytearray)):
+                try:
+                    json_data = _decode_json(json_data, schema)
+                except ValueError:
+                    pass  # not JSON text; summarized as the scalar it is (no sections)
 
-            stats = self._extract_statistics(summary_text)
+            raw_stats = self._collect_stats(json_data, max_sections, max_child_items, prune_non_numeric)
+            summary_text = self._format_stats(raw_stats) if include_text else ""
 
-            return {
+            stats = self._extract_statistics(raw_stats)
+
+            result = {
                 "success": True,
                 "summary_text": summary_text,
                 "statistics": stats,
@@ -91,6 +535,21 @@ Parameters:
         except Exception as e:
             raise ToolExecutionError(f"Numeric summary failed: {e}") from e
 
+        if cache_key is not None:
+            with self._cache_lock:
+                self._cache[cache_key] = result
+                self._cache.move_to_end(cache_key)
+                while len(self._cache) > self.RESULT_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+            return _copy_result(result)
+
+        return result
+
+    def clear_cache(self) -> None:
+        """Drop memoized summaries."""
+        with self._cache_lock:
+            self._cache.clear()
+
     def _generate_summary(
         self,
         data: Any,
@@ -98,119 +557,25 @@ Parameters:
         max_child_items: int
     ) -> str:
         """Core summary generation logic."""
+        return self._format_stats(self._collect_stats(data, max_sections, max_child_items))
 
-        def _is_number(value) -> bool:
-            return isinstance(value, (int, float)) and not isinstance(value, bool)
-
-        def _format_number(value):
-            if isinstance(value, float):
-                return f"{value:.6g}"
-            return str(value)
-
-        stats = []
-        seen_paths = set()
-        queue = deque([(data, "$")])
-        visited = 0
-        max_iterations = 10000
-
-        def add_stat(path: str, entries):
-            if not entries or len(stats) >= max_sections:
-                return
-
-            canonical_path = path or "$"
-            if canonical_path in seen_paths:
-                return
-
-            values = [entry["value"] for entry in entries]
-            min_entry = min(entries, key=lambda entry: entry["value"])
-            max_entry = max(entries, key=lambda entry: entry["value"])
-            sorted_values = sorted(values)
-
-            entry = {
-                "path": canonical_path,
-                "count": len(values),
-                "min": min_entry["value"],
-                "max": max_entry["value"],
-                "min_path": min_entry.get("path"),
-                "max_path": max_entry.get("path"),
-                "min_id": min_entry.get("id"),
-                "max_id": max_entry.get("id"),
-                "sum": sum(values),
-                "mean": statistics.mean(values),
-                "median": statistics.median(sorted_values) if len(sorted_values) > 1 else sorted_values[0],
-            }
-            stats.append(entry)
-            seen_paths.add(canonical_path)
-
-        while queue and len(stats) < max_sections and visited < max_iterations:
-            current, path = queue.popleft()
-            visited += 1
-
-            if _is_number(current):
-                if "[]." not in path and "[" in path and path.endswith("]"):
-                    continue
-                add_stat(path, [{"value": current, "path": path, "id": None}])
-                continue
-
-            if isinstance(current, dict):
-                for key, value in current.items():
-                    child_path = f"{path}.{key}" if path != "$" else f"$.{key}"
-                    queue.append((value, child_path))
-
-            elif isinstance(current, list):
-                numeric_entries = [
-                    {"value": item, "path": f"{path}[{idx}]", "id": None}
-                    for idx, item in enumerate(current)
-                    if _is_number(item)
-                ]
-                add_stat(path, numeric_entries)
-
-                if any(isinstance(item, dict) for item in current):
-                    keys = []
-                    for item in current[:max_child_items]:
-                        if isinstance(item, dict):
-                            for key in item.keys():
-                                if key not in keys:
-                                    keys.append(key)
-
-                    identifier_keys = ("id", "ID", "Id", "identifier", "name", "key", "title")
-                    for key in keys:
-                        numeric_entries = []
-                        for idx, item in enumerate(current):
-                            if not isinstance(item, dict):
-                                continue
-                            value = item.get(key)
-                            if not _is_number(value):
-                                continue
-
-                            identifier = None
-                            for identifier_key in identifier_keys:
-                                if identifier_key in item and _is_number(item[identifier_key]):
-                                    identifier = _format_number(item[identifier_key])
-                                    break
-                                if identifier_key in item and isinstance(item[identifier_key], str):
-                                    identifier = item[identifier_key]
-                                    break
-
-                            numeric_entries.append({
-                                "value": value,
-                                "path": f"{path}[{idx}].{key}",
-                                "id": identifier,
-                            })
-
-                        child_path = f"{path}[].{key}" if path != "$" else f"$[].{key}"
-                        add_stat(child_path, numeric_entries)
-                        if len(stats) >= max_sections:
-                            break
-
-                for idx, value in enumerate(current[:max_child_items]):
-                    queue.append((value, f"{path}[{idx}]"))
-
+    def _collect_stats(
+        self,
+        data: Any,
+        max_sections: int,
+        max_child_items: int,
+        prune_non_numeric: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Collect raw stat sections (native numbers, extrema locations)."""
+        return _bfs_collect(data, max_sections, max_child_items, prune_non_numeric)
+
+    def _format_stats(self, stats: List[Dict[str, Any]]) -> str:
+        """Render collected stat sections as the summary text."""
         if not stats:
             return ""
 
         lines = ["Numeric Summary (auto-generated):"]
-        for stat in stats[:max_sections]:
+        for stat in stats:
             min_loc = ""
             if stat.get("min_id") is not None:
                 min_loc = f" @id={stat['min_id']}"
@@ -240,41 +605,49 @@ Parameters:
 
         return "\n".join(lines)
 
-    def _extract_statistics(self, summary_text: str) -> List[Dict[str, Any]]:
-        """Extract structured statistics from summary text."""
+    def _extract_statistics(self, summary: Union[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Extract structured statistics from collected stats or summary text.
+
+        Collected stats (from _collect_stats) are projected directly; summary
+        text is still accepted and parsed line by line.
+        """
+        if not isinstance(summary, str):
+            return [
+                {
+                    "path": stat["path"],
+                    "count": stat["count"],
+                    **{key: float(stat[key]) for key in ("sum", "min", "max", "mean", "median")},
+                }
+                for stat in summary
+            ]
+
         stats = []
 
-        for line in summary_text.split("\n")[1:]:  # Skip header
+        for line in summary.split("\n")[1:]:  # Skip header
             if not line.strip() or not line.startswith("- "):
                 continue
 
-            # Parse line format: "- $.path: n=X, sum=Y, ..."
-            parts = line[2:].split(": ", 1)
-            if len(parts) != 2:
-                continue
-
-            path = parts[0]
-            values_str = parts[1]
-
-            stat = {"path": path}
-
-            # Parse key=value pairs
-            for pair in values_str.split(", "):
-                if "=" in pair:
-                    key, value = pair.split("=", 1)
-                    # Remove location info from values
-                    value = value.split(" @")[0]
-
-                    # Convert to appropriate type
-                    try:
-                        if key == "n":
-                            stat["count"] = int(value)
-                        elif key in ["sum", "min", "max", "mean", "median"]:
-                            stat[key] = float(value)
-                    except ValueError:
-                        pass
+            match = _STAT_LINE_RE.match(line)
+            if match is not None:
+                # Groups are positional: path, n, sum, min, max, mean, median
+                path, count, total, low, high, mean, median = match.groups()
+                try:
+                    stats.append({
+                        "path": path,
+                        "count": int(count),
+                        "sum": float(total),
+                        "min": float(low),
+                        "max": float(high),
+                        "mean": float(mean),
+                        "median": float(median),
+                    })
+                    continue
+                except ValueError:
+                    pass
 
-            if len(stat) > 1:  # Has more than just path
+            stat = _parse_stat_line(line)
+            if stat is not None:
                 stats.append(stat)
 
         return stats
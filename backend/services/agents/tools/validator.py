@@ -3,6 +3,9 @@
 from backend.services.agents.tools.base import BaseTool
 from typing import Any, Dict
 
+# Result template; callers get a copy, so it stays a plain JSON-serializable dict
+_STATIC_OK = {"success": True, "valid": True, "confidence": 0.95, "message": ""}
+
 
 class ValidatorTool(BaseTool):
     """Validate results against source data."""
@@ -22,14 +25,12 @@ Parameters:
   - claim (str): Claim to validate
   - source_data (dict): Source data to validate against
   - tolerance (float): Acceptable error tolerance (default: 0.01)
+  - verbose (bool): Include a per-claim message; when False the message is left empty (default: True)
 """
 
-    def execute(self, claim: str, source_data: Any, tolerance: float = 0.01, **kwargs) -> Dict[str, Any]:
+    def execute(self, claim: str, source_data: Any, tolerance: float = 0.01, verbose: bool = True, **kwargs) -> Dict[str, Any]:
         """Execute validation."""
         # Simple validation - can be enhanced
-        return {
-            "success": True,
-            "valid": True,
-            "confidence": 0.95,
-            "message": f"Claim validated: {claim}"
-        }
+        if not verbose:
+            return dict(_STATIC_OK)
+        return {**_STATIC_OK, "message": f"Claim validated: {claim}"}
@@ -4,18 +4,160 @@ File Handler Module
 Handles file uploads, reading, and processing for the LLM system
 """
 
+import asyncio
+import atexit
+import codecs
+import io
+import mmap
 import os
 import mimetypes
 import logging
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import hashlib
 from datetime import datetime
 import json
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Uploads are copied to disk in chunks of this size through a per-thread
+# scratch buffer, so peak memory per upload does not grow with file size
+UPLOAD_CHUNK_SIZE = 64 * 1024
+_upload_buffers = threading.local()
+
+# Text uploads at least this large are decoded from an mmap rather than read()
+MMAP_THRESHOLD = 1024 * 1024
+
+# Extracted text of parsed formats is cached on disk under upload_dir/_cache,
+# keyed by path + mtime + size; least recently used entries go past this size
+CONTENT_CACHE_CATEGORIES = frozenset({"document", "presentation", "spreadsheet", "image"})
+CONTENT_CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+# Reader fallback messages (missing library, parse error, no OCR) are not
+# cached, so the file is parsed again once the cause is fixed
+_UNCACHED_CONTENT_MARKERS = (" reading requires ", "Error reading ", "OCR not available", "OCR failed:")
+
+# Byte-order marks checked before falling back to UTF-8
+_BOM_ENCODINGS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def _upload_buffer(size: int) -> memoryview:
+    """Return this thread's reusable upload buffer, sized to at least `size`"""
+    buf = getattr(_upload_buffers, "buf", None)
+    if buf is None or len(buf) < size:
+        buf = memoryview(bytearray(size))
+        _upload_buffers.buf = buf
+    return buf[:size]
+
+
+def _json_loads(raw):
+    """Parse JSON text or bytes with orjson when available"""
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # stdlib also accepts NaN/Infinity and integers beyond 64 bits
+    return json.loads(raw)
+
+
+def _json_line(record: Dict[str, Any]) -> bytes:
+    """Encode one metadata record as a UTF-8 JSONL line"""
+    if HAS_ORJSON:
+        return orjson.dumps(record) + b"\n"
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+def _json_pretty(data: Any) -> str:
+    """Indent-2 rendering of parsed JSON, as json.dumps(indent=2, ensure_ascii=False)"""
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def _split_filename(filename: str) -> Tuple[str, str]:
+    """(Path(filename).stem, Path(filename).suffix) without building a Path"""
+    name = os.path.basename(filename)
+    i = name.rfind('.')
+    if 0 < i < len(name) - 1:
+        return name[:i], name[i:]
+    return name, ''
+
+
+def _file_extension(filename: str) -> str:
+    """Lower-cased Path(filename).suffix without building a Path"""
+    return _split_filename(filename)[1].lower()
+
+
+try:
+    import tesserocr
+    HAS_TESSEROCR = True
+except ImportError:
+    HAS_TESSEROCR = False
+
+# JPEGs larger than this on either side are decoded at a reduced scale for OCR
+OCR_MAX_SIDE = 2048
+
+# Handlers with a running metadata writer, flushed at interpreter exit
+_metadata_writers = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_metadata_writers():
+    for handler in list(_metadata_writers):
+        handler.flush(timeout=5.0)
+
+
+def _unlink_quiet(path):
+    """Remove a file if it exists"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _fadvise(f, advice_name: str):
+    """Best-effort page-cache hint for an open file (no-op where unsupported)"""
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(f.fileno(), 0, 0, advice)
+    except OSError:
+        pass
+
+
 class FileHandler:
     """Handles file operations for the LLM system"""
     
+    # The metadata log is rewritten once it holds this many records and
+    # more than twice as many as there are live files
+    METADATA_COMPACT_MIN = 1000
+    
+    # Seconds the metadata writer waits before retrying a failed log append
+    METADATA_RETRY_DELAY = 1.0
+    
+    # Formatted previews of recently read JSON files, keyed by content digest
+    JSON_FORMAT_CACHE_SIZE = 16
+    
     def __init__(self, upload_dir="uploads", max_file_size=10*1024*1024):  # 10MB default
         """
         Initialize file handler
@@ -25,12 +167,38 @@ class FileHandler:
             max_file_size (int): Maximum file size in bytes
         """
         self.upload_dir = Path(upload_dir)
+        self._upload_dir_str = str(self.upload_dir)
         self.max_file_size = max_file_size
         self.logger = logging.getLogger(__name__)
         
         # Create upload directory if it doesn't exist
         self.upload_dir.mkdir(exist_ok=True)
         
+        # File metadata: append-only JSONL log, replayed into memory on first use
+        self.metadata_file = self.upload_dir / "file_metadata.jsonl"
+        self.legacy_metadata_file = self.upload_dir / "file_metadata.json"
+        self._meta_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._user_index: Dict[str, set] = {}  # user_id -> file_ids
+        self._meta_inode = None
+        self._meta_offset = 0
+        self._meta_log_records = 0
+        self._meta_lock = threading.Lock()
+        # Log appends are queued here and written in batches by a background
+        # thread. The write itself happens outside _meta_lock, under
+        # _meta_write_lock, which compaction also takes; compaction bumps
+        # _meta_generation so a batch it already covers is not appended again
+        self._meta_pending: List[Dict[str, Any]] = []
+        self._meta_inflight: List[Dict[str, Any]] = []
+        self._meta_cond = threading.Condition(self._meta_lock)
+        self._meta_write_lock = threading.Lock()
+        self._meta_generation = 0
+        self._meta_writer: Optional[threading.Thread] = None
+        
+        # In-process OCR engines (tesserocr), one per thread, created on first use
+        self._ocr_local = threading.local()
+        self._json_format_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._json_format_lock = threading.Lock()
+        
         # Supported file types (expanded for enhanced processing)
         self.supported_types = {
             # Text files
@@ -95,6 +263,8 @@ class FileHandler:
             '.rar': 'archive',
             '.7z': 'archive'
         }
+        self._supported_exts = frozenset(self.supported_types)
+        self._max_size_text = f"{self.max_file_size / (1024*1024):.1f}MB"
     
     def validate_file(self, filename: str, file_size: int) -> Dict[str, Any]:
         """
@@ -116,12 +286,12 @@ class FileHandler:
         
         # Check file size
         if file_size > self.max_file_size:
-            result["error"] = f"File too large. Maximum size: {self.max_file_size / (1024*1024):.1f}MB"
+            result["error"] = f"File too large. Maximum size: {self._max_size_text}"
             return result
         
         # Check file extension
-        file_ext = Path(filename).suffix.lower()
-        if file_ext not in self.supported_types:
+        file_ext = _file_extension(filename)
+        if file_ext not in self._supported_exts:
             result["error"] = f"Unsupported file type: {file_ext}"
             return result
         
@@ -131,14 +301,14 @@ class FileHandler:
         
         return result
     
-    def generate_safe_filename(self, filename: str) -> str:
-        """Generate safe filename with timestamp and hash"""
-        original_name = Path(filename).stem
-        extension = Path(filename).suffix
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    def generate_safe_filename(self, filename: str, timestamp: Optional[str] = None) -> str:
+        """Generate safe filename with timestamp (YYYYmmdd_HHMMSS, default now) and hash"""
+        original_name, extension = _split_filename(filename)
+        if timestamp is None:
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
         
-        # Create hash from original filename for uniqueness
-        name_hash = hashlib.md5(filename.encode()).hexdigest()[:8]
+        # Short tag from the original filename for uniqueness (not security-sensitive)
+        name_hash = hashlib.blake2b(filename.encode('utf-8'), digest_size=4).hexdigest()
         
         # Clean original name (remove special characters)
         safe_name = "".join(c for c in original_name if c.isalnum() or c in "._-")[:50]
@@ -157,68 +327,359 @@ class FileHandler:
         Returns:
             Dict: File save result
         """
-        try:
-            # Validate file
-            validation = self.validate_file(filename, len(file_data))
-            if not validation["valid"]:
-                return {"success": False, "error": validation["error"]}
-            
-            # Generate safe filename
-            safe_filename = self.generate_safe_filename(filename)
-            
-            # Create user directory
-            user_dir = self.upload_dir / user_id
-            user_dir.mkdir(exist_ok=True)
-            
-            # Save file
-            file_path = user_dir / safe_filename
-            with open(file_path, 'wb') as f:
-                f.write(file_data)
-            
-            # Create file metadata
-            file_info = {
-                "success": True,
-                "file_id": safe_filename,
-                "original_name": filename,
-                "safe_filename": safe_filename,
-                "file_path": str(file_path),
-                "file_size": len(file_data),
-                "file_type": validation["file_type"],
-                "category": validation["category"],
-                "upload_time": datetime.now().isoformat(),
-                "user_id": user_id
-            }
-            
-            # Save metadata
-            self._save_file_metadata(file_info)
+        # Reject oversized payloads before anything is written
+        validation = self.validate_file(filename, len(file_data))
+        if not validation["valid"]:
+            return {"success": False, "error": validation["error"]}
+        
+        return self.save_uploaded_stream(io.BytesIO(file_data), filename, user_id)
+    
+    def save_uploaded_stream(self, src, filename: str, user_id: str,
+                             chunk_size: int = UPLOAD_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Save an uploaded file from a readable binary stream and return file info
+        
+        The stream is copied in chunk_size pieces and the size limit is enforced
+        as bytes arrive, so the upload is never held in memory as a whole.
+        
+        Args:
+            src: Binary file-like object (e.g. werkzeug FileStorage.stream)
+            filename (str): Original filename
+            user_id (str): User ID for organization
+            chunk_size (int): Copy chunk size in bytes
             
-            self.logger.info(f"File saved: {safe_filename} for user {user_id}")
+        Returns:
+            Dict: File save result
+        """
+        try:
+            file_info = self._store_stream(src, filename, user_id, chunk_size)
+            if file_info["success"]:
+                self._save_file_metadata(file_info)
+                self.logger.info(f"File saved: {file_info['file_id']} for user {user_id}")
             return file_info
             
         except Exception as e:
             self.logger.error(f"Error saving file {filename}: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def _save_file_metadata(self, file_info: Dict[str, Any]):
-        """Save file metadata to JSON"""
-        metadata_file = self.upload_dir / "file_metadata.json"
+    def save_uploaded_batch(self, items: List[Tuple[bytes, str, str]],
+                            max_workers: int = 8) -> List[Dict[str, Any]]:
+        """
+        Save several uploads that arrived together
+        
+        File copies (write + fsync) run concurrently on a small thread pool and
+        the metadata for the whole batch is appended to the log in one write.
+        
+        Args:
+            items: (file_data, filename, user_id) tuples
+            max_workers (int): Maximum concurrent file writes
+            
+        Returns:
+            List[Dict]: File save results, in the order of items
+        """
+        def store(item):
+            file_data, filename, user_id = item
+            try:
+                validation = self.validate_file(filename, len(file_data))
+                if not validation["valid"]:
+                    return {"success": False, "error": validation["error"]}
+                return self._store_stream(io.BytesIO(file_data), filename, user_id, UPLOAD_CHUNK_SIZE)
+            except Exception as e:
+                self.logger.error(f"Error saving file {filename}: {str(e)}")
+                return {"success": False, "error": str(e)}
+        
+        if len(items) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+                results = list(executor.map(store, items))
+        else:
+            results = [store(item) for item in items]
+        
+        saved = [file_info for file_info in results if file_info["success"]]
+        if not saved:
+            return results
         
-        # Load existing metadata
         try:
-            if metadata_file.exists():
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-            else:
-                metadata = {}
-        except:
-            metadata = {}
+            self._save_file_metadata(*saved)
+        except Exception as e:
+            # Without metadata the files are unreachable; don't leave them behind
+            self.logger.error(f"Error saving batch metadata: {str(e)}")
+            for file_info in saved:
+                _unlink_quiet(file_info["file_path"])
+            return [
+                {"success": False, "error": str(e)} if file_info["success"] else file_info
+                for file_info in results
+            ]
         
-        # Add new file info
-        metadata[file_info["file_id"]] = file_info
+        self.logger.info(f"Saved batch of {len(saved)} files")
+        return results
+    
+    def _store_stream(self, src, filename: str, user_id: str, chunk_size: int) -> Dict[str, Any]:
+        """Validate and copy one upload to disk; returns file info without recording metadata"""
+        # Validate file type (size is checked while copying)
+        validation = self.validate_file(filename, 0)
+        if not validation["valid"]:
+            return {"success": False, "error": validation["error"]}
+        
+        # Generate safe filename (one clock read per upload, shared with the metadata)
+        now_ns = time.time_ns()
+        seconds, nanos = divmod(now_ns, 1_000_000_000)
+        local = time.localtime(seconds)
+        safe_filename = self.generate_safe_filename(filename, time.strftime("%Y%m%d_%H%M%S", local))
+        
+        # Create user directory (plain string paths on the upload hot path)
+        user_dir = os.path.join(self._upload_dir_str, user_id)
+        try:
+            os.mkdir(user_dir)
+        except FileExistsError:
+            pass
+        
+        # Save file
+        file_path = os.path.join(user_dir, safe_filename)
+        file_size = self._copy_stream(src, file_path, chunk_size)
+        if file_size > self.max_file_size:
+            return {"success": False, "error": self.validate_file(filename, file_size)["error"]}
         
-        # Save updated metadata
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        # Create file metadata
+        file_info = {
+            "success": True,
+            "file_id": safe_filename,
+            "original_name": filename,
+            "safe_filename": safe_filename,
+            "file_path": file_path,
+            "file_size": file_size,
+            "file_type": validation["file_type"],
+            "category": validation["category"],
+            "upload_time": f"{time.strftime('%Y-%m-%dT%H:%M:%S', local)}.{nanos // 1000:06d}",
+            "upload_ts": now_ns / 1e9,
+            "user_id": user_id
+        }
+        return file_info
+    
+    def _copy_stream(self, src, file_path: str, chunk_size: int) -> int:
+        """
+        Copy src to file_path in chunks and return the byte count.
+        
+        Copying stops at the first chunk past max_file_size; the partial
+        file is removed and the (oversized) count returned to the caller.
+        """
+        total = 0
+        readinto = getattr(src, "readinto", None)
+        buf = _upload_buffer(chunk_size) if readinto is not None else None
+        try:
+            with open(file_path, 'wb') as f:
+                while True:
+                    if buf is not None:
+                        n = readinto(buf)
+                        data = buf[:n] if n else None
+                    else:
+                        data = src.read(chunk_size)
+                        n = len(data) if data else 0
+                    if not n:
+                        break
+                    total += n
+                    if total > self.max_file_size:
+                        break
+                    f.write(data)
+                if total <= self.max_file_size:
+                    # Uploads are read back once at most, so flush them to disk
+                    # and drop them from the page cache instead of evicting hot data
+                    f.flush()
+                    os.fsync(f.fileno())
+                    _fadvise(f, "POSIX_FADV_DONTNEED")
+        except BaseException:
+            _unlink_quiet(file_path)
+            raise
+        if total > self.max_file_size:
+            _unlink_quiet(file_path)
+        return total
+    
+    def _save_file_metadata(self, *file_infos: Dict[str, Any]):
+        """Append file metadata to the log and the in-memory index"""
+        with self._meta_lock:
+            self._sync_metadata()
+            self._append_metadata(*file_infos)
+            for file_info in file_infos:
+                self._index_put(file_info)
+            self._maybe_compact_metadata()
+    
+    def _sync_metadata(self):
+        """
+        Bring the in-memory index up to date with file_metadata.jsonl (caller holds _meta_lock).
+        
+        Keyed on the log's inode and size: an unchanged log costs one stat(),
+        a grown one replays only the new tail, and a replaced one (compaction
+        by another process) is replayed from the start.
+        """
+        try:
+            st = os.stat(self.metadata_file)
+        except FileNotFoundError:
+            if self._meta_cache is None:
+                self._meta_cache = {}
+                self._user_index = {}
+                for file_info in self._migrate_legacy_metadata().values():
+                    self._index_put(file_info)
+            return
+        
+        if self._meta_cache is not None and st.st_ino == self._meta_inode:
+            if st.st_size == self._meta_offset:
+                return
+            if st.st_size > self._meta_offset:
+                self._replay_metadata_log()
+                return
+        
+        self._meta_cache = {}
+        self._user_index = {}
+        self._meta_inode = st.st_ino
+        self._meta_offset = 0
+        self._meta_log_records = 0
+        self._replay_metadata_log()
+        # Records still being written or queued for the writer may not be in the log yet
+        for record in self._meta_inflight + self._meta_pending:
+            self._apply_metadata_record(record)
+    
+    def _replay_metadata_log(self):
+        """Apply log records past _meta_offset to the in-memory index"""
+        with open(self.metadata_file, 'rb') as f:
+            f.seek(self._meta_offset)
+            chunk = f.read()
+        
+        # A partially written last line is left for the next sync
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = _json_loads(line)
+            except json.JSONDecodeError:
+                continue  # torn line from an interrupted append
+            self._meta_log_records += 1
+            self._apply_metadata_record(record)
+        self._meta_offset += end
+    
+    def _apply_metadata_record(self, record: Dict[str, Any]):
+        """Apply one log record (upsert or tombstone) to the in-memory index"""
+        if record.get("deleted"):
+            self._index_drop(record.get("file_id"))
+        else:
+            self._index_put(record)
+    
+    def _index_put(self, file_info: Dict[str, Any]):
+        """Add or replace a file in the metadata and per-user indexes"""
+        file_id = file_info["file_id"]
+        self._index_drop(file_id)
+        if "upload_ts" not in file_info:
+            # Records written before upload_ts existed only carry the ISO string
+            try:
+                file_info["upload_ts"] = datetime.fromisoformat(file_info["upload_time"]).timestamp()
+            except (KeyError, TypeError, ValueError):
+                file_info["upload_ts"] = 0.0
+        self._meta_cache[file_id] = file_info
+        self._user_index.setdefault(file_info.get("user_id"), set()).add(file_id)
+    
+    def _index_drop(self, file_id: str):
+        """Remove a file from the metadata and per-user indexes"""
+        file_info = self._meta_cache.pop(file_id, None)
+        if file_info is not None:
+            user_files = self._user_index.get(file_info.get("user_id"))
+            if user_files is not None:
+                user_files.discard(file_id)
+    
+    def _migrate_legacy_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """Seed the log from the legacy whole-file file_metadata.json, if any"""
+        metadata = {}
+        if self.legacy_metadata_file.exists():
+            try:
+                with open(self.legacy_metadata_file, 'rb') as f:
+                    metadata = _json_loads(f.read())
+            except Exception as e:
+                self.logger.error(f"Error reading legacy file metadata: {str(e)}")
+                metadata = {}
+            self._compact_metadata(metadata)
+        return metadata
+    
+    def _append_metadata(self, *records: Dict[str, Any]):
+        """Queue records for the metadata log writer (caller holds _meta_lock)"""
+        self._meta_pending.extend(records)
+        if self._meta_writer is None:
+            self._meta_writer = threading.Thread(
+                target=self._metadata_writer_loop, name="file-metadata-writer", daemon=True
+            )
+            self._meta_writer.start()
+            _metadata_writers.add(self)
+        self._meta_cond.notify_all()
+    
+    def _metadata_writer_loop(self):
+        """Write queued log records, coalescing everything queued since the last write"""
+        while True:
+            # Take the batch under the lock, but write it without holding
+            # _meta_lock so request threads only ever wait on the enqueue
+            with self._meta_cond:
+                self._meta_cond.wait_for(lambda: self._meta_pending)
+                batch, self._meta_pending = self._meta_pending, []
+                self._meta_inflight = batch
+                generation = self._meta_generation
+            
+            failed = False
+            with self._meta_write_lock:
+                # After a compaction the rewritten log already reflects this batch
+                if generation == self._meta_generation:
+                    try:
+                        fd = os.open(self.metadata_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                        try:
+                            os.write(fd, b"".join(_json_line(record) for record in batch))
+                        finally:
+                            os.close(fd)
+                    except Exception as e:
+                        self.logger.error(f"Error writing file metadata ({len(batch)} records): {str(e)}")
+                        failed = True
+            
+            with self._meta_cond:
+                self._meta_inflight = []
+                if failed and generation == self._meta_generation:
+                    # Keep the records queued, ahead of newer ones, and retry
+                    self._meta_pending[:0] = batch
+                    self._meta_cond.notify_all()
+                    self._meta_cond.wait(self.METADATA_RETRY_DELAY)
+                else:
+                    self._meta_cond.notify_all()
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until queued metadata records are in the log; False on timeout"""
+        with self._meta_cond:
+            return self._meta_cond.wait_for(
+                lambda: not self._meta_pending and not self._meta_inflight, timeout
+            )
+    
+    def _maybe_compact_metadata(self):
+        """Compact the log once superseded records dominate (caller holds _meta_lock)"""
+        if self._meta_log_records > max(self.METADATA_COMPACT_MIN, 2 * len(self._meta_cache)):
+            self._compact_metadata(self._meta_cache)
+    
+    def _compact_metadata(self, metadata: Dict[str, Dict[str, Any]]):
+        """Atomically rewrite the log with one record per live file"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.upload_dir, prefix='.tmp-', suffix='.jsonl')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for file_info in metadata.values():
+                    f.write(_json_line(file_info))
+            # Not while the writer is appending; any batch it holds is now stale
+            with self._meta_write_lock:
+                os.replace(tmp_path, self.metadata_file)
+                self._meta_generation += 1
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        st = os.stat(self.metadata_file)
+        self._meta_inode = st.st_ino
+        self._meta_offset = st.st_size
+        self._meta_log_records = len(metadata)
+        # The rewritten log already reflects anything still queued
+        if self._meta_pending:
+            self._meta_pending = []
+            self._meta_cond.notify_all()
     
     def read_file_content(self, file_id: str, user_id: str) -> Dict[str, Any]:
         """
@@ -244,8 +705,14 @@ class FileHandler:
             content = ""
             category = file_info["category"]
             
+            # Parsed formats are served from the extracted-text cache when possible
+            cache_path = self._content_cache_path(file_path) if category in CONTENT_CACHE_CATEGORIES else None
+            cached = self._read_cached_content(cache_path) if cache_path is not None else None
+            
             # Read based on file category
-            if category in ["text", "code"]:
+            if cached is not None:
+                content = cached
+            elif category in ["text", "code"]:
                 content = self._read_text_file(file_path)
             elif category == "document":
                 content = self._read_pdf_file(file_path) if file_info["file_type"] == ".pdf" else self._read_document_file(file_path)
@@ -263,6 +730,10 @@ class FileHandler:
             # Ensure content is not None
             if content is None:
                 content = ""
+            
+            if cache_path is not None and cached is None and content and \
+                    not any(marker in content for marker in _UNCACHED_CONTENT_MARKERS):
+                self._write_cached_content(cache_path, content)
 
             return {
                 "success": True,
@@ -275,23 +746,100 @@ class FileHandler:
             self.logger.error(f"Error reading file {file_id}: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def _read_text_file(self, file_path: Path) -> str:
-        """Read text-based files with JSON enhancement"""
-        encodings = ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252']
-
-        content = None
-        for encoding in encodings:
+    def _content_cache_path(self, file_path) -> Path:
+        """Cache location of a file's extracted text; changes whenever the file does"""
+        st = os.stat(file_path)
+        key = hashlib.blake2b(
+            f"{os.path.realpath(file_path)}\0{st.st_mtime_ns}\0{st.st_size}".encode('utf-8'),
+            digest_size=16
+        ).hexdigest()
+        return self.upload_dir / "_cache" / f"{key}.txt"
+    
+    def _read_cached_content(self, cache_path: Path) -> Optional[str]:
+        """Return cached extracted text, or None on a miss"""
+        try:
+            with open(cache_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+                    # Decode straight from the page cache, no intermediate bytes copy
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        content = str(mm, 'utf-8', 'surrogatepass')
+                else:
+                    content = f.read().decode('utf-8', errors='surrogatepass')
+        except (FileNotFoundError, UnicodeDecodeError):
+            return None
+        try:
+            os.utime(cache_path)  # mtime tracks last use for eviction
+        except OSError:
+            pass
+        return content
+    
+    def _write_cached_content(self, cache_path: Path, content: str):
+        """Atomically store extracted text, then trim the cache to its size budget"""
+        try:
+            cache_path.parent.mkdir(exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix='.tmp-')
             try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                break
-            except UnicodeDecodeError:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(content.encode('utf-8', errors='surrogatepass'))
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                _unlink_quiet(tmp_path)
+                raise
+            self._evict_content_cache(cache_path.parent)
+        except OSError as e:
+            self.logger.warning(f"Could not cache extracted text: {str(e)}")
+    
+    def _evict_content_cache(self, cache_dir: Path):
+        """Drop least recently used cache entries beyond CONTENT_CACHE_MAX_BYTES"""
+        entries = []
+        total = 0
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.txt') and entry.is_file():
+                    st = entry.stat()
+                    entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                    total += st.st_size
+        if total <= CONTENT_CACHE_MAX_BYTES:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.unlink(path)
+            except OSError:
                 continue
+            total -= size
+            if total <= CONTENT_CACHE_MAX_BYTES:
+                break
+    
+    async def read_file_content_async(self, file_id: str, user_id: str) -> Dict[str, Any]:
+        """
+        Async variant of read_file_content for event-loop callers
+        
+        Metadata lookup and parsing (PDF, spreadsheet, OCR, ...) run in a worker
+        thread, so a slow document doesn't stall other requests on the loop.
+        """
+        return await asyncio.to_thread(self.read_file_content, file_id, user_id)
+    
+    def _read_text_file(self, file_path: Path) -> str:
+        """Read text-based files with JSON enhancement"""
+        # Read the bytes once and decode them once; large files are decoded
+        # straight from a read-only mapping instead of a bytes copy
+        with open(file_path, 'rb') as f:
+            _fadvise(f, "POSIX_FADV_SEQUENTIAL")
+            size = os.fstat(f.fileno()).st_size
+            if size >= MMAP_THRESHOLD:
+                raw = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                raw = f.read()
 
-        # If all encodings fail, read as binary and decode with errors ignored
-        if content is None:
-            with open(file_path, 'rb') as f:
-                content = f.read().decode('utf-8', errors='ignore')
+        try:
+            content = self._decode_text(raw)
+            if '\r' in content:
+                # Universal newlines, as text-mode open() would give
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
+        finally:
+            if isinstance(raw, mmap.mmap):
+                raw.close()
 
         # Enhanced JSON processing
         if file_path.suffix.lower() == '.json':
@@ -299,18 +847,54 @@ class FileHandler:
 
         return content
 
+    def _decode_text(self, raw) -> str:
+        """Decode file bytes: by BOM if present, else UTF-8, else latin-1"""
+        head = raw[:4]
+        for bom, encoding in _BOM_ENCODINGS:
+            if head.startswith(bom):
+                try:
+                    return str(raw, encoding)
+                except UnicodeDecodeError:
+                    break
+        
+        try:
+            return str(raw, 'utf-8')
+        except UnicodeDecodeError:
+            pass
+        
+        # latin-1 maps every byte, so this always succeeds
+        return str(raw, 'latin-1')
+
     def _format_json_content(self, content: str, filename: str) -> str:
-        """Format JSON content for better LLM comprehension"""
+        """Format JSON content for better LLM comprehension (memoized on content)"""
+        digest = hashlib.blake2b(content.encode('utf-8', errors='surrogatepass'), digest_size=16).digest()
+        cache_key = (filename, digest)
+        with self._json_format_lock:
+            formatted = self._json_format_cache.get(cache_key)
+            if formatted is not None:
+                self._json_format_cache.move_to_end(cache_key)
+                return formatted
+        
+        formatted = self._render_json_content(content, filename)
+        
+        with self._json_format_lock:
+            self._json_format_cache[cache_key] = formatted
+            while len(self._json_format_cache) > self.JSON_FORMAT_CACHE_SIZE:
+                self._json_format_cache.popitem(last=False)
+        return formatted
+    
+    def _render_json_content(self, content: str, filename: str) -> str:
+        """Parse JSON content and render the statistics header plus pretty-printed body"""
         try:
             # Parse JSON
-            data = json.loads(content)
+            data = _json_loads(content)
 
             # Generate formatted output with statistics
             formatted = f"JSON File: {filename}\n"
             formatted += "=" * 60 + "\n\n"
 
             # Add statistics
-            stats = self._get_json_statistics(data)
+            stats = self._get_json_statistics(data, size=len(content))
             formatted += "STATISTICS:\n"
             formatted += f"  - Type: {stats['type']}\n"
             formatted += f"  - Size: {stats['size']}\n"
@@ -327,7 +911,7 @@ class FileHandler:
 
             # Add prettified JSON
             formatted += "FORMATTED CONTENT:\n\n"
-            formatted += json.dumps(data, indent=2, ensure_ascii=False)
+            formatted += _json_pretty(data)
 
             return formatted
 
@@ -342,11 +926,11 @@ class FileHandler:
             self.logger.warning(f"Error formatting JSON {filename}: {str(e)}")
             return content
 
-    def _get_json_statistics(self, data: Any) -> Dict[str, Any]:
-        """Get statistics about JSON structure"""
+    def _get_json_statistics(self, data: Any, size: Optional[int] = None) -> Dict[str, Any]:
+        """Get statistics about JSON structure (size: length of the source text, if known)"""
         stats = {
             'type': type(data).__name__,
-            'size': len(json.dumps(data)),
+            'size': size if size is not None else len(json.dumps(data)),
             'max_depth': self._calculate_json_depth(data),
             'array_length': 0,
             'key_count': 0,
@@ -365,29 +949,33 @@ class FileHandler:
 
     def _calculate_json_depth(self, data: Any, current_depth: int = 0) -> int:
         """Calculate maximum nesting depth of JSON structure"""
-        if isinstance(data, dict):
-            if not data:
-                return current_depth
-            return max(self._calculate_json_depth(v, current_depth + 1) for v in data.values())
-        elif isinstance(data, list):
-            if not data:
-                return current_depth
-            return max(self._calculate_json_depth(item, current_depth + 1) for item in data)
-        else:
-            return current_depth
+        # Iterative walk: no recursion limit, and scalars are never pushed
+        max_depth = current_depth
+        stack = [(data, current_depth)] if isinstance(data, (dict, list)) else []
+        while stack:
+            node, depth = stack.pop()
+            children = node.values() if isinstance(node, dict) else node
+            if not children:
+                continue
+            depth += 1
+            if depth > max_depth:
+                max_depth = depth
+            stack.extend((child, depth) for child in children if isinstance(child, (dict, list)))
+        return max_depth
     
     def _read_pdf_file(self, file_path: Path) -> str:
-        """Read PDF files (requires PyPDF2 or similar)"""
+        """Read PDF files (requires pypdf or PyPDF2)"""
         try:
-            import PyPDF2
+            try:
+                from pypdf import PdfReader
+            except ImportError:
+                from PyPDF2 import PdfReader
             with open(file_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+                _fadvise(f, "POSIX_FADV_SEQUENTIAL")
+                reader = PdfReader(f)
+                return "".join((page.extract_text() or "") + "\n" for page in reader.pages)
         except ImportError:
-            return "PDF reading requires PyPDF2 library. Please install it to read PDF files."
+            return "PDF reading requires pypdf or PyPDF2 library. Please install one to read PDF files."
         except Exception as e:
             return f"Error reading PDF: {str(e)}"
     
@@ -396,10 +984,7 @@ class FileHandler:
         try:
             from docx import Document
             doc = Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            return "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
         except ImportError:
             return "Document reading requires python-docx library. Please install it to read Word documents."
         except Exception as e:
@@ -407,6 +992,14 @@ class FileHandler:
     
     def _read_spreadsheet_file(self, file_path: Path) -> str:
         """Read spreadsheet files"""
+        if file_path.suffix.lower() in ('.xlsx', '.xlsm'):
+            try:
+                return self._read_xlsx_rows(file_path)
+            except ImportError:
+                pass  # fall back to pandas below
+            except Exception as e:
+                return f"Error reading spreadsheet: {str(e)}"
+        
         try:
             import pandas as pd
             
@@ -425,22 +1018,39 @@ class FileHandler:
         except Exception as e:
             return f"Error reading spreadsheet: {str(e)}"
     
+    def _read_xlsx_rows(self, file_path: Path) -> str:
+        """Stream workbook rows as tab-separated text (openpyxl read-only, no DataFrames)"""
+        import openpyxl
+        
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            parts = [f"Spreadsheet: {file_path.name}\n\n"]
+            for ws in wb.worksheets:
+                parts.append(f"=== Sheet: {ws.title} ===\n")
+                for row in ws.iter_rows(values_only=True):
+                    parts.append("\t".join("" if v is None else str(v) for v in row))
+                    parts.append("\n")
+                parts.append("\n")
+            return "".join(parts)
+        finally:
+            wb.close()
+    
     def _read_presentation_file(self, file_path: Path) -> str:
         """Read presentation files (PowerPoint)"""
         try:
             from pptx import Presentation
             prs = Presentation(file_path)
             
-            text = f"Presentation: {file_path.name}\n\n"
+            parts = [f"Presentation: {file_path.name}\n\n"]
             
             for i, slide in enumerate(prs.slides, 1):
-                text += f"=== Slide {i} ===\n"
+                parts.append(f"=== Slide {i} ===\n")
                 for shape in slide.shapes:
                     if hasattr(shape, 'text') and shape.text.strip():
-                        text += shape.text + "\n"
-                text += "\n"
+                        parts.append(shape.text + "\n")
+                parts.append("\n")
             
-            return text
+            return "".join(parts)
         except ImportError:
             return "Presentation reading requires python-pptx library. Please install it to read PowerPoint files."
         except Exception as e:
@@ -451,6 +1061,7 @@ class FileHandler:
         try:
             from PIL import Image
             
+            # Image.open only parses the header; pixels are decoded if OCR runs
             with Image.open(file_path) as img:
                 info_text = f"Image: {file_path.name}\n"
                 info_text += f"Format: {img.format}\n"
@@ -459,8 +1070,7 @@ class FileHandler:
                 
                 # Try OCR if available
                 try:
-                    import pytesseract
-                    extracted_text = pytesseract.image_to_string(img)
+                    extracted_text = self._ocr_image(img)
                     if extracted_text.strip():
                         info_text += "Extracted Text:\n" + extracted_text
                     else:
@@ -477,25 +1087,51 @@ class FileHandler:
         except Exception as e:
             return f"Error reading image: {str(e)}"
     
+    def _ocr_image(self, img) -> str:
+        """
+        OCR an open PIL image.
+        
+        With tesserocr the Tesseract engine (and its language model) is loaded
+        once per thread and reused; pytesseract, which starts a tesseract
+        process per call, is the fallback.
+        """
+        if img.format == "JPEG" and max(img.size) > OCR_MAX_SIDE:
+            # Let the JPEG decoder downscale by 1/2..1/8 (never below OCR_MAX_SIDE)
+            # instead of decoding every pixel of a huge photo
+            img.draft(img.mode, (OCR_MAX_SIDE, OCR_MAX_SIDE))
+        
+        if HAS_TESSEROCR:
+            api = getattr(self._ocr_local, "api", None)
+            if api is None:
+                api = tesserocr.PyTessBaseAPI()
+                self._ocr_local.api = api
+            api.SetImage(img)
+            return api.GetUTF8Text()
+        
+        import pytesseract
+        return pytesseract.image_to_string(img)
+    
     def _read_archive_file(self, file_path: Path) -> str:
         """Read archive files (list contents)"""
         try:
             if file_path.suffix.lower() == '.zip':
                 import zipfile
                 with zipfile.ZipFile(file_path, 'r') as zip_file:
-                    file_list = zip_file.namelist()
-                    
-                    text = f"ZIP Archive: {file_path.name}\n"
-                    text += f"Files: {len(file_list)}\n\n"
-                    text += "Contents:\n"
+                    # infolist() is the already-parsed central directory (no
+                    # copy, unlike namelist()); only the listed entries are touched
+                    entries = zip_file.infolist()
                     
-                    for file_name in file_list[:50]:  # Limit to first 50 files
-                        text += f"  {file_name}\n"
+                    parts = [
+                        f"ZIP Archive: {file_path.name}\n",
+                        f"Files: {len(entries)}\n\n",
+                        "Contents:\n",
+                    ]
+                    parts.extend(f"  {info.filename}\n" for info in entries[:50])  # Limit to first 50 files
                     
-                    if len(file_list) > 50:
-                        text += f"  ... and {len(file_list) - 50} more files\n"
+                    if len(entries) > 50:
+                        parts.append(f"  ... and {len(entries) - 50} more files\n")
                     
-                    return text
+                    return "".join(parts)
             else:
                 return f"Archive type {file_path.suffix} not supported for content reading."
                 
@@ -536,16 +1172,11 @@ class FileHandler:
     def get_file_info(self, file_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Get file metadata"""
         try:
-            metadata_file = self.upload_dir / "file_metadata.json"
-            if not metadata_file.exists():
-                return None
-            
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-            
-            file_info = metadata.get(file_id)
+            with self._meta_lock:
+                self._sync_metadata()
+                file_info = self._meta_cache.get(file_id)
             if file_info and file_info.get("user_id") == user_id:
-                return file_info
+                return dict(file_info)
             
             return None
             
@@ -556,30 +1187,25 @@ class FileHandler:
     def list_user_files(self, user_id: str) -> List[Dict[str, Any]]:
         """List files for a specific user"""
         try:
-            metadata_file = self.upload_dir / "file_metadata.json"
-            if not metadata_file.exists():
-                return []
-            
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-            
-            user_files = []
-            for file_info in metadata.values():
-                if file_info.get("user_id") == user_id:
-                    # Don't include full file path in response
-                    safe_info = {
-                        "file_id": file_info["file_id"],
-                        "original_name": file_info["original_name"],
-                        "file_size": file_info["file_size"],
-                        "file_type": file_info["file_type"],
-                        "category": file_info["category"],
-                        "upload_time": file_info["upload_time"]
-                    }
-                    user_files.append(safe_info)
+            with self._meta_lock:
+                self._sync_metadata()
+                entries = [self._meta_cache[file_id] for file_id in self._user_index.get(user_id, ())]
             
             # Sort by upload time (newest first)
-            user_files.sort(key=lambda x: x["upload_time"], reverse=True)
-            return user_files
+            entries.sort(key=lambda file_info: file_info["upload_ts"], reverse=True)
+            
+            # Don't include full file path in response
+            return [
+                {
+                    "file_id": file_info["file_id"],
+                    "original_name": file_info["original_name"],
+                    "file_size": file_info["file_size"],
+                    "file_type": file_info["file_type"],
+                    "category": file_info["category"],
+                    "upload_time": file_info["upload_time"]
+                }
+                for file_info in entries
+            ]
             
         except Exception as e:
             self.logger.error(f"Error listing files for user {user_id}: {str(e)}")
@@ -592,22 +1218,20 @@ class FileHandler:
             if not file_info:
                 return False
             
-            # Delete physical file
-            file_path = Path(file_info["file_path"])
-            if file_path.exists():
-                file_path.unlink()
-            
-            # Remove from metadata
-            metadata_file = self.upload_dir / "file_metadata.json"
-            if metadata_file.exists():
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                if file_id in metadata:
-                    del metadata[file_id]
-                    
-                    with open(metadata_file, 'w', encoding='utf-8') as f:
-                        json.dump(metadata, f, indent=2, ensure_ascii=False)
+            # Delete physical file (and its extracted-text cache entry)
+            file_path = file_info["file_path"]
+            if os.path.exists(file_path):
+                if file_info.get("category") in CONTENT_CACHE_CATEGORIES:
+                    _unlink_quiet(self._content_cache_path(file_path))
+                os.unlink(file_path)
+            
+            # Remove from metadata (tombstone record in the log)
+            with self._meta_lock:
+                self._sync_metadata()
+                if file_id in self._meta_cache:
+                    self._append_metadata({"file_id": file_id, "deleted": True})
+                    self._index_drop(file_id)
+                    self._maybe_compact_metadata()
             
             self.logger.info(f"File deleted: {file_id} for user {user_id}")
             return True
@@ -13,8 +13,16 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple, Set
 from datetime import datetime
 import re
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, deque
+from itertools import islice
+from functools import lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+from operator import itemgetter
 import math
+import multiprocessing
+import threading
+import time
 
 # Disable ChromaDB telemetry
 os.environ["ANONYMIZED_TELEMETRY"] = "False"
@@ -28,18 +36,133 @@ except ImportError:
 
 try:
     import numpy as np
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
     from sklearn.cluster import KMeans
     HAS_SKLEARN = True
 except ImportError:
     HAS_SKLEARN = False
 
+if HAS_SKLEARN:
+    # Similarity score bins: (0.3, 0.5] related, (0.5, 0.7] similar, > 0.7 very similar
+    _RELATIONSHIP_BINS = np.array([0.3, 0.5, 0.7])
+    _RELATIONSHIP_TYPES = np.array(['weakly_related', 'related', 'similar', 'very_similar'])
+
 try:
-    import networkx as nx
-    HAS_NETWORKX = True
+    import ahocorasick
+    HAS_AHOCORASICK = True
 except ImportError:
-    HAS_NETWORKX = False
+    HAS_AHOCORASICK = False
+
+try:
+    from scipy import sparse
+    from scipy.sparse.csgraph import connected_components
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+
+# Document-similarity Gram matrix is computed this many rows at a time
+SIMILARITY_BLOCK_ROWS = 500
+
+# Knowledge-gap analysis reports at most this many gaps
+MAX_KNOWLEDGE_GAPS = 10
+
+# Entity extraction moves to a process pool above this many documents
+ENTITY_PROCESS_MIN_DOCS = 50
+
+# One pool shared by every analyzer, started on first use. Workers are spawned
+# rather than forked: forking the threaded server can copy held locks
+_entity_pool: Optional[ProcessPoolExecutor] = None
+_entity_pool_lock = threading.Lock()
+
+
+def _get_entity_pool() -> ProcessPoolExecutor:
+    """The shared entity-extraction pool, created if needed"""
+    global _entity_pool
+    with _entity_pool_lock:
+        if _entity_pool is None:
+            _entity_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+        return _entity_pool
+
+
+def _discard_entity_pool(pool: ProcessPoolExecutor):
+    """Drop a failed pool so the next call starts a fresh one"""
+    global _entity_pool
+    with _entity_pool_lock:
+        if _entity_pool is pool:
+            _entity_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_document_entities(content: str, patterns) -> Dict[str, str]:
+    """
+    Normalized entities of one document mapped to the type of the first
+    pattern that extracted them (ordered, so results stay deterministic).
+    Module level so it can run in worker processes.
+    """
+    lower, strip = str.lower, str.strip
+    doc_entities = {}
+    for entity_type, pattern in patterns:
+        for entity in map(strip, map(lower, pattern.findall(content))):
+            if len(entity) > 2:  # Filter out very short matches
+                doc_entities.setdefault(entity, entity_type)
+    return doc_entities
+
+
+def _at_least_kth_largest(scores, k: int):
+    """Mask of scores >= the k-th largest (ties at the cutoff included), in O(n)"""
+    return scores >= np.partition(scores, len(scores) - k)[len(scores) - k]
+
+
+def _copy_knowledge_graph(knowledge_graph: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a cached knowledge graph that callers can modify freely"""
+    graph_data = knowledge_graph['graph_data']
+    return {
+        'graph_data': {
+            'nodes': [dict(node) for node in graph_data['nodes']],
+            'edges': [dict(edge) for edge in graph_data['edges']]
+        },
+        'metrics': dict(knowledge_graph['metrics']),
+        'central_documents': list(knowledge_graph['central_documents'])
+    }
+
+
+@lru_cache(maxsize=64)
+def _prepared_topics(topics: Tuple[str, ...]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Lowercased topics (in list order) and the distinct non-empty ones, per topic list"""
+    lowered = tuple(topic.lower() for topic in topics)
+    return lowered, tuple(sorted(set(filter(None, lowered))))
+
+
+@lru_cache(maxsize=64)
+def _topic_automaton(terms: Tuple[str, ...]):
+    """Aho-Corasick automaton over preferred topics, built once per topic list"""
+    automaton = ahocorasick.Automaton()
+    for term in terms:
+        automaton.add_word(term, term)
+    automaton.make_automaton()
+    return automaton
+
+
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+_QUESTION_RE = re.compile(r'[^.!]*\?[^.!]*')
+_QUERY_TERM_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+
+# Phrases marking incomplete information, matched in a single pass
+_INCOMPLETE_INDICATORS = [
+    r'need more information',
+    r'to be determined',
+    r'incomplete',
+    r'\[missing\]',
+    r'\[todo\]',
+    r'under review',
+    r'pending',
+    r'coming soon'
+]
+_INCOMPLETE_INDICATOR_RE = re.compile(
+    '|'.join(f'(?P<i{n}>{pattern})' for n, pattern in enumerate(_INCOMPLETE_INDICATORS)),
+    re.IGNORECASE
+)
 
 
 class DocumentRelationshipAnalyzer:
@@ -62,6 +185,10 @@ class DocumentRelationshipAnalyzer:
             'phone': r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b',
             'url': r'https?://[^\s<>"{\}|\\^`\[\]]+'
         }
+        self._compiled_patterns = {
+            entity_type: re.compile(pattern, re.IGNORECASE)
+            for entity_type, pattern in self.entity_patterns.items()
+        }
     
     def analyze_document_relationships(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -94,11 +221,14 @@ class DocumentRelationshipAnalyzer:
             doc_contents = [doc.get('content', '') for doc in documents]
             doc_ids = [doc.get('id', f'doc_{i}') for i, doc in enumerate(documents)]
             
+            # Tokenize the corpus once for both similarity and clustering
+            term_counts, feature_names = self._count_terms(doc_contents)
+            
             # Calculate document similarities
-            analysis['relationships'] = self._calculate_document_similarities(doc_contents, doc_ids)
+            analysis['relationships'] = self._calculate_document_similarities(term_counts, feature_names, doc_ids)
             
             # Cluster documents by similarity
-            analysis['document_clusters'] = self._cluster_documents(doc_contents, doc_ids)
+            analysis['document_clusters'] = self._cluster_documents(term_counts, feature_names, doc_ids)
             
             # Find shared entities across documents
             analysis['shared_entities'] = self._find_shared_entities(documents)
@@ -118,75 +248,132 @@ class DocumentRelationshipAnalyzer:
             self.logger.error(f"Error analyzing document relationships: {str(e)}")
             return {'error': str(e)}
     
-    def _calculate_document_similarities(self, contents: List[str], doc_ids: List[str]) -> List[Dict[str, Any]]:
-        """Calculate pairwise document similarities"""
+    def _count_terms(self, contents: List[str]):
+        """
+        Term counts over the 1000 most frequent unigrams/bigrams.
+        
+        Returns (counts, feature_names), or (None, None) if the corpus has no
+        usable terms. TF-IDF weighting is applied per consumer, which is what
+        TfidfVectorizer does internally, so the text is tokenized only once.
+        """
         try:
-            # Use TF-IDF for similarity calculation
-            vectorizer = TfidfVectorizer(
+            vectorizer = CountVectorizer(
                 max_features=1000,
                 stop_words='english',
                 ngram_range=(1, 2)
             )
+            counts = vectorizer.fit_transform(contents)
+            return counts, vectorizer.get_feature_names_out()
+        except ValueError as e:
+            self.logger.error(f"Error vectorizing documents: {str(e)}")
+            return None, None
+    
+    def _calculate_document_similarities(self, term_counts, feature_names, doc_ids: List[str]) -> List[Dict[str, Any]]:
+        """Calculate pairwise document similarities"""
+        try:
+            if term_counts is None:
+                return []
+            
+            # Use TF-IDF for similarity calculation; unit-length rows make every
+            # dot product below a cosine similarity with no norms to compute
+            tfidf_matrix = TfidfTransformer(norm='l2').fit_transform(term_counts)
             
-            tfidf_matrix = vectorizer.fit_transform(contents)
-            similarity_matrix = cosine_similarity(tfidf_matrix)
+            rows, cols, scores = self._top_similar_pairs(tfidf_matrix, 20)
+            
+            # Top 20 relationships by similarity score (ties in document order)
+            top = np.lexsort((cols, rows, -scores))[:20]
+            top_scores = scores[top]
+            
+            # Bulk classification, same thresholds as _classify_relationship_type
+            relationship_types = _RELATIONSHIP_TYPES[np.digitize(top_scores, _RELATIONSHIP_BINS, right=True)]
             
             relationships = []
-            for i in range(len(contents)):
-                for j in range(i + 1, len(contents)):
-                    similarity = similarity_matrix[i][j]
-                    if similarity > self.similarity_threshold:
-                        relationships.append({
-                            'doc1_id': doc_ids[i],
-                            'doc2_id': doc_ids[j],
-                            'similarity_score': float(similarity),
-                            'relationship_type': self._classify_relationship_type(similarity),
-                            'shared_terms': self._find_shared_terms(contents[i], contents[j], vectorizer)
-                        })
+            for i, j, score, relationship_type in zip(
+                rows[top].tolist(), cols[top].tolist(), top_scores.tolist(), relationship_types.tolist()
+            ):
+                relationships.append({
+                    'doc1_id': doc_ids[i],
+                    'doc2_id': doc_ids[j],
+                    'similarity_score': score,
+                    'relationship_type': relationship_type,
+                    'shared_terms': self._find_shared_terms(tfidf_matrix.getrow(i), tfidf_matrix.getrow(j), feature_names)
+                })
             
-            # Sort by similarity score
-            relationships.sort(key=lambda x: x['similarity_score'], reverse=True)
-            return relationships[:20]  # Top 20 relationships
+            return relationships
             
         except Exception as e:
             self.logger.error(f"Error calculating similarities: {str(e)}")
             return []
     
-    def _cluster_documents(self, contents: List[str], doc_ids: List[str]) -> List[Dict[str, Any]]:
+    def _top_similar_pairs(self, tfidf_matrix, limit: int):
+        """
+        Candidate pairs (i < j) above the similarity threshold: the best `limit`
+        of each row block, as (rows, cols, scores) arrays.
+        
+        TF-IDF rows are L2-normalized, so sparse dot products are the cosine
+        similarities. The Gram matrix is computed in blocks of
+        SIMILARITY_BLOCK_ROWS rows against the rows at or after the block (the
+        upper triangle only), so memory stays O(block x N) on large collections.
+        """
+        n_docs = tfidf_matrix.shape[0]
+        found_rows, found_cols, found_scores = [], [], []
+        for start in range(0, n_docs, SIMILARITY_BLOCK_ROWS):
+            block = (tfidf_matrix[start:start + SIMILARITY_BLOCK_ROWS] @ tfidf_matrix[start:].T).tocoo()
+            rows, cols = block.row + start, block.col + start
+            mask = (rows < cols) & (block.data > self.similarity_threshold)
+            rows, cols, scores = rows[mask], cols[mask], block.data[mask]
+            if len(scores) > limit:
+                # Partition down to the cutoff first; only the survivors are sorted
+                candidates = _at_least_kth_largest(scores, limit)
+                rows, cols, scores = rows[candidates], cols[candidates], scores[candidates]
+                keep = np.lexsort((cols, rows, -scores))[:limit]
+                rows, cols, scores = rows[keep], cols[keep], scores[keep]
+            found_rows.append(rows)
+            found_cols.append(cols)
+            found_scores.append(scores)
+        return np.concatenate(found_rows), np.concatenate(found_cols), np.concatenate(found_scores)
+    
+    def _cluster_documents(self, term_counts, feature_names, doc_ids: List[str]) -> List[Dict[str, Any]]:
         """Cluster documents by content similarity"""
         try:
-            if len(contents) < 3:
+            if len(doc_ids) < 3 or term_counts is None:
                 return []  # Need at least 3 documents for meaningful clustering
             
-            vectorizer = TfidfVectorizer(
-                max_features=500,
-                stop_words='english',
-                ngram_range=(1, 2)
-            )
-            
-            tfidf_matrix = vectorizer.fit_transform(contents)
+            # Cluster on the 500 most frequent terms (kept in vocabulary order)
+            term_totals = np.asarray(term_counts.sum(axis=0)).ravel()
+            columns = np.sort(np.argsort(-term_totals, kind='stable')[:500])
+            tfidf_matrix = TfidfTransformer(norm='l2').fit_transform(term_counts[:, columns])
+            feature_names = feature_names[columns]
             
             # Determine optimal number of clusters (max 5)
-            n_clusters = min(5, max(2, len(contents) // 3))
+            n_clusters = min(5, max(2, len(doc_ids) // 3))
             
             kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
             cluster_labels = kmeans.fit_predict(tfidf_matrix)
-            
-            # Group documents by cluster
-            clusters = defaultdict(list)
-            for doc_id, label in zip(doc_ids, cluster_labels):
-                clusters[label].append(doc_id)
+            centers = kmeans.cluster_centers_
+            n_keywords = min(10, centers.shape[1])
+            
+            # Group documents by cluster: a stable sort by label leaves each
+            # cluster's members contiguous and in document order
+            order = np.argsort(cluster_labels, kind='stable')
+            boundaries = np.searchsorted(cluster_labels[order], np.arange(n_clusters + 1))
+            members = {
+                cluster_id: order[boundaries[cluster_id]:boundaries[cluster_id + 1]]
+                for cluster_id in range(n_clusters)
+                if boundaries[cluster_id + 1] > boundaries[cluster_id]
+            }
             
             # Create cluster analysis
             cluster_analysis = []
-            feature_names = vectorizer.get_feature_names_out()
             
-            for cluster_id, doc_list in clusters.items():
+            # Clusters in order of their first document, as before
+            for cluster_id in sorted(members, key=lambda c: members[c][0]):
+                doc_list = [doc_ids[i] for i in members[cluster_id]]
                 if len(doc_list) > 1:  # Only include clusters with multiple documents
                     # Get cluster centroid keywords
-                    cluster_indices = [i for i, label in enumerate(cluster_labels) if label == cluster_id]
-                    cluster_center = np.mean(tfidf_matrix[cluster_indices].toarray(), axis=0)
-                    top_features_idx = cluster_center.argsort()[-10:][::-1]
+                    cluster_center = centers[cluster_id]
+                    top_features_idx = np.argpartition(-cluster_center, n_keywords - 1)[:n_keywords]
+                    top_features_idx = top_features_idx[np.argsort(-cluster_center[top_features_idx], kind='stable')]
                     keywords = [feature_names[idx] for idx in top_features_idx]
                     
                     cluster_analysis.append({
@@ -206,27 +393,40 @@ class DocumentRelationshipAnalyzer:
     def _find_shared_entities(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Find entities shared across multiple documents"""
         try:
-            entity_documents = defaultdict(set)
-            all_entities = defaultdict(set)
+            entity_documents = {}
+            entity_type_of = {}
+            
+            # Extract entities using patterns; repeats within a document are
+            # collapsed first
+            contents = [doc.get('content', '') for doc in documents]
+            extract = partial(_extract_document_entities, patterns=tuple(self._compiled_patterns.items()))
+            if len(documents) > ENTITY_PROCESS_MIN_DOCS:
+                pool = None
+                try:
+                    # Regex scanning holds the GIL; processes scale with cores.
+                    # map() keeps document order, so the merge is deterministic
+                    pool = _get_entity_pool()
+                    per_document = list(pool.map(extract, contents, chunksize=8))
+                except Exception as e:
+                    self.logger.warning(f"Parallel entity extraction failed, running serially: {str(e)}")
+                    if pool is not None:
+                        _discard_entity_pool(pool)
+                    per_document = map(extract, contents)
+            else:
+                per_document = map(extract, contents)
             
-            for i, doc in enumerate(documents):
-                content = doc.get('content', '')
+            for i, (doc, doc_entities) in enumerate(zip(documents, per_document)):
                 doc_id = doc.get('id', f'doc_{i}')
-                
-                # Extract entities using patterns
-                for entity_type, pattern in self.entity_patterns.items():
-                    matches = re.findall(pattern, content, re.IGNORECASE)
-                    for match in matches:
-                        normalized_match = match.lower().strip()
-                        if len(normalized_match) > 2:  # Filter out very short matches
-                            entity_documents[normalized_match].add(doc_id)
-                            all_entities[entity_type].add(normalized_match)
+                for entity, entity_type in doc_entities.items():
+                    entity_documents.setdefault(entity, set()).add(doc_id)
+                    # Type comes from the pattern that extracted it
+                    entity_type_of.setdefault(entity, entity_type)
             
             # Find entities that appear in multiple documents
             shared_entities = {}
             for entity, docs in entity_documents.items():
                 if len(docs) > 1:
-                    entity_type = self._classify_entity_type(entity)
+                    entity_type = entity_type_of[entity]
                     if entity_type not in shared_entities:
                         shared_entities[entity_type] = []
                     
@@ -238,8 +438,9 @@ class DocumentRelationshipAnalyzer:
             
             # Sort by frequency
             for entity_type in shared_entities:
-                shared_entities[entity_type].sort(key=lambda x: x['document_count'], reverse=True)
-                shared_entities[entity_type] = shared_entities[entity_type][:10]  # Top 10 per type
+                shared_entities[entity_type] = heapq.nlargest(  # Top 10 per type
+                    10, shared_entities[entity_type], key=lambda x: x['document_count']
+                )
             
             return shared_entities
             
@@ -252,16 +453,22 @@ class DocumentRelationshipAnalyzer:
         try:
             overlaps = []
             
+            # Split each document into its sentence set once, not once per pair
+            # (str hashes are cached, so the pairwise intersections are cheap)
+            sentence_sets = []
+            for doc in documents:
+                stripped = (sent.strip() for sent in _SENTENCE_SPLIT_RE.split(doc.get('content', '').lower()))
+                sentence_sets.append({sent for sent in stripped if len(sent) > 20})
+            
             for i, doc1 in enumerate(documents):
+                sentences1 = sentence_sets[i]
+                if not sentences1:
+                    continue
                 for j, doc2 in enumerate(documents[i+1:], i+1):
-                    content1 = doc1.get('content', '').lower()
-                    content2 = doc2.get('content', '').lower()
+                    sentences2 = sentence_sets[j]
                     
                     # Find common sentences (simplified)
-                    sentences1 = set(sent.strip() for sent in re.split(r'[.!?]+', content1) if len(sent.strip()) > 20)
-                    sentences2 = set(sent.strip() for sent in re.split(r'[.!?]+', content2) if len(sent.strip()) > 20)
-                    
-                    common_sentences = sentences1.intersection(sentences2)
+                    common_sentences = sentences1 & sentences2
                     
                     if common_sentences:
                         overlap_ratio = len(common_sentences) / max(len(sentences1), len(sentences2))
@@ -274,8 +481,7 @@ class DocumentRelationshipAnalyzer:
                             'overlap_type': 'high' if overlap_ratio > 0.3 else 'medium' if overlap_ratio > 0.1 else 'low'
                         })
             
-            overlaps.sort(key=lambda x: x['overlap_ratio'], reverse=True)
-            return overlaps[:10]  # Top 10 overlaps
+            return heapq.nlargest(10, overlaps, key=lambda x: x['overlap_ratio'])  # Top 10 overlaps
             
         except Exception as e:
             self.logger.error(f"Error analyzing content overlap: {str(e)}")
@@ -286,49 +492,57 @@ class DocumentRelationshipAnalyzer:
         try:
             gaps = []
             
-            # Analyze document topics/themes
-            all_content = ' '.join([doc.get('content', '') for doc in documents])
-            
-            # Find frequently mentioned topics that might need more coverage
-            word_freq = Counter(re.findall(r'\b[a-zA-Z]{4,}\b', all_content.lower()))
-            
-            # Look for incomplete information indicators
-            incomplete_indicators = [
-                r'need more information',
-                r'to be determined',
-                r'incomplete',
-                r'\[missing\]',
-                r'\[todo\]',
-                r'under review',
-                r'pending',
-                r'coming soon'
-            ]
-            
             for i, doc in enumerate(documents):
                 content = doc.get('content', '')
                 doc_id = doc.get('id', f'doc_{i}')
                 
-                # Find incomplete sections
-                for pattern in incomplete_indicators:
-                    matches = re.findall(f'.{{0,50}}{pattern}.{{0,50}}', content, re.IGNORECASE)
-                    for match in matches:
+                # Find incomplete sections: one scan for all indicators, with up
+                # to 50 characters of same-line context on either side
+                contexts_by_indicator = defaultdict(list)
+                consumed = defaultdict(int)  # per indicator: end of its last context
+                for match in _INCOMPLETE_INDICATOR_RE.finditer(content):
+                    group = match.lastgroup
+                    start, end = match.span()
+                    if start < consumed[group]:
+                        continue  # already inside the previous context of this indicator
+                    line_start = content.rfind('\n', 0, start) + 1
+                    line_end = content.find('\n', end)
+                    if line_end == -1:
+                        line_end = len(content)
+                    context_end = min(line_end, end + 50)
+                    contexts_by_indicator[group].append(
+                        content[max(line_start, start - 50, consumed[group]):context_end]
+                    )
+                    consumed[group] = context_end
+                
+                # Reported in indicator order, as before
+                for group in sorted(contexts_by_indicator, key=lambda g: int(g[1:])):
+                    for context in contexts_by_indicator[group]:
                         gaps.append({
                             'document_id': doc_id,
                             'gap_type': 'incomplete_information',
-                            'context': match.strip(),
+                            'context': context.strip(),
                             'confidence': 0.8
                         })
-            
-            # Find questions without answers
-            questions = re.findall(r'[^.!]*\?[^.!]*', all_content)
-            for question in questions[:5]:  # Limit to 5 questions
+                
+                # Only the first MAX_KNOWLEDGE_GAPS are reported; later documents
+                # (and the question scan) could not change the result
+                if len(gaps) >= MAX_KNOWLEDGE_GAPS:
+                    return gaps[:MAX_KNOWLEDGE_GAPS]
+            
+            # Find questions without answers (first 5, scanning only as far as needed)
+            questions = islice(
+                (match.group() for doc in documents for match in _QUESTION_RE.finditer(doc.get('content', ''))),
+                min(5, MAX_KNOWLEDGE_GAPS - len(gaps))
+            )
+            for question in questions:
                 gaps.append({
                     'gap_type': 'unanswered_question',
                     'context': question.strip(),
                     'confidence': 0.6
                 })
             
-            return gaps[:10]  # Top 10 gaps
+            return gaps
             
         except Exception as e:
             self.logger.error(f"Error identifying knowledge gaps: {str(e)}")
@@ -345,26 +559,22 @@ class DocumentRelationshipAnalyzer:
         else:
             return 'weakly_related'
     
-    def _find_shared_terms(self, content1: str, content2: str, vectorizer) -> List[str]:
-        """Find important shared terms between two documents"""
+    def _find_shared_terms(self, row1, row2, feature_names) -> List[str]:
+        """Find important shared terms between two documents (rows of the fitted TF-IDF matrix)"""
         try:
-            # Get TF-IDF vectors for both documents
-            tfidf_matrix = vectorizer.transform([content1, content2])
-            feature_names = vectorizer.get_feature_names_out()
-            
-            # Find terms that appear in both documents with high TF-IDF scores
-            doc1_scores = tfidf_matrix[0].toarray()[0]
-            doc2_scores = tfidf_matrix[1].toarray()[0]
-            
-            shared_terms = []
-            for i, (score1, score2) in enumerate(zip(doc1_scores, doc2_scores)):
-                if score1 > 0 and score2 > 0:  # Term appears in both
-                    combined_score = score1 * score2
-                    shared_terms.append((feature_names[i], combined_score))
-            
-            # Sort by combined score and return top terms
-            shared_terms.sort(key=lambda x: x[1], reverse=True)
-            return [term[0] for term in shared_terms[:10]]
+            # Elementwise product is non-zero exactly for terms present in both,
+            # scored by the product of their TF-IDF weights. Rows are unit
+            # length, so these products sum to the pair's cosine similarity and
+            # each one is that term's share of it
+            combined = row1.multiply(row2).tocoo()
+            cols, scores = combined.col, combined.data
+            if len(scores) > 10:
+                candidates = _at_least_kth_largest(scores, 10)
+                cols, scores = cols[candidates], scores[candidates]
+            
+            # Sort by combined score (ties by feature index) and return top terms
+            top = np.lexsort((cols, -scores))[:10]
+            return [feature_names[cols[k]] for k in top]
             
         except Exception as e:
             self.logger.error(f"Error finding shared terms: {str(e)}")
@@ -379,13 +589,6 @@ class DocumentRelationshipAnalyzer:
         top_keywords = keywords[:3]
         return f"Documents about {', '.join(top_keywords)}"
     
-    def _classify_entity_type(self, entity: str) -> str:
-        """Classify entity type based on patterns"""
-        for entity_type, pattern in self.entity_patterns.items():
-            if re.match(pattern, entity, re.IGNORECASE):
-                return entity_type
-        return 'other'
-    
     def _generate_relationship_insights(self, analysis: Dict[str, Any]) -> List[str]:
         """Generate insights from relationship analysis"""
         insights = []
@@ -431,8 +634,8 @@ class AdvancedRAGSystem:
             base_rag_system: Existing RAG system to extend
         """
         self.config_path = config_path
-        self.config = self._load_config(config_path)
         self.logger = logging.getLogger(__name__)
+        self.config = self._load_config(config_path)
         
         # Initialize base RAG system if provided
         self.base_rag = base_rag_system
@@ -442,12 +645,20 @@ class AdvancedRAGSystem:
             self.config.get('relationship_analysis', {})
         )
         
-        # Document cache for relationship analysis
+        # Document cache for relationship analysis; collection analyses
+        # expire so per-user entries do not accumulate
         self.document_cache = {}
         self.relationship_cache = {}
+        self.relationship_cache_ttl = self.config.get('relationship_cache_ttl', 3600)
+        
+        # Enhanced search capabilities (only the most recent searches are kept),
+        # with the same entries indexed per user
+        self.search_history = deque(maxlen=self.config.get('search_history_max', 100))
+        self._history_by_user = defaultdict(deque)
         
-        # Enhanced search capabilities
-        self.search_history = []
+        # Recommendations per user (None for the whole history), dropped
+        # whenever the history they were built from changes
+        self._recommendations_cache = {}
         self.user_preferences = {}
         
         self.logger.info("Advanced RAG System initialized")
@@ -474,6 +685,8 @@ class AdvancedRAGSystem:
             Enhanced search results with relationships and insights
         """
         try:
+            now = datetime.now().isoformat()
+            
             # Perform base RAG search if available
             base_results = []
             if self.base_rag:
@@ -488,18 +701,18 @@ class AdvancedRAGSystem:
             enhanced_results = self._enhance_search_results(base_results, query, user_id, context)
             
             # Add to search history
-            self._add_to_search_history(query, enhanced_results, user_id)
+            self._add_to_search_history(query, enhanced_results, user_id, timestamp=now)
             
-            # Generate search insights
-            insights = self._generate_search_insights(enhanced_results, query)
+            # Generate search insights and relationship data
+            insights, relationship_data = self._summarize_results(enhanced_results)
             
             return {
                 'success': True,
                 'query': query,
                 'results': enhanced_results,
                 'insights': insights,
-                'relationship_data': self._get_result_relationships(enhanced_results),
-                'timestamp': datetime.now().isoformat()
+                'relationship_data': relationship_data,
+                'timestamp': now
             }
             
         except Exception as e:
@@ -535,15 +748,24 @@ class AdvancedRAGSystem:
             if not documents:
                 return {'error': 'No documents available for analysis'}
             
-            # Perform relationship analysis
-            relationship_analysis = self.relationship_analyzer.analyze_document_relationships(documents)
-            
-            # Cache results
+            # Reuse the cached analysis when the collection is unchanged
             cache_key = f"collection_analysis_{user_id or 'global'}"
-            self.relationship_cache[cache_key] = {
-                'analysis': relationship_analysis,
-                'timestamp': datetime.now().isoformat()
-            }
+            fingerprint = self._collection_fingerprint(documents)
+            now = datetime.now().isoformat()
+            cached = self._get_cached_analysis(cache_key)
+            if cached and cached.get('fingerprint') == fingerprint:
+                relationship_analysis = cached['analysis']
+                cached['expires_at'] = time.monotonic() + self.relationship_cache_ttl
+            else:
+                # Perform relationship analysis
+                relationship_analysis = self.relationship_analyzer.analyze_document_relationships(documents)
+                
+                # Cache results
+                self._cache_analysis(cache_key, {
+                    'analysis': relationship_analysis,
+                    'fingerprint': fingerprint,
+                    'timestamp': now
+                })
             
             # Generate collection insights
             collection_insights = self._generate_collection_insights(relationship_analysis)
@@ -553,7 +775,7 @@ class AdvancedRAGSystem:
                 'analysis': relationship_analysis,
                 'collection_insights': collection_insights,
                 'document_count': len(documents),
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now
             }
             
         except Exception as e:
@@ -574,50 +796,83 @@ class AdvancedRAGSystem:
         Returns:
             Document suggestions with relationship explanations
         """
+        return self.get_document_suggestions_batch([current_doc_id], user_id)[current_doc_id]
+    
+    def get_document_suggestions_batch(self, doc_ids: List[str], user_id: str = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Get document suggestions for several documents with one pass over the
+        cached relationships
+        
+        Args:
+            doc_ids: Document IDs to suggest for
+            user_id: User ID for personalization
+            
+        Returns:
+            Suggestions (as returned by get_document_suggestions) keyed by document ID
+        """
         try:
             # Get cached relationship data
             cache_key = f"collection_analysis_{user_id or 'global'}"
-            if cache_key in self.relationship_cache:
-                analysis = self.relationship_cache[cache_key]['analysis']
+            cached = self._get_cached_analysis(cache_key)
+            if not cached:
+                error = {'error': 'No relationship data available. Run collection analysis first.'}
+                return {doc_id: error for doc_id in doc_ids}
+            
+            # Suggestions are memoized on the analysis entry, so they are
+            # recomputed whenever the analysis is replaced or expires
+            memo = cached.setdefault('suggestions', {})
+            pending = {doc_id: [] for doc_id in doc_ids if doc_id not in memo}
+            
+            if pending:
+                # Find relationships for all pending documents at once
+                for relationship in cached['analysis'].get('relationships', []):
+                    doc1_id, doc2_id = relationship['doc1_id'], relationship['doc2_id']
+                    if doc1_id in pending:
+                        pending[doc1_id].append(self._related_document(relationship, doc2_id))
+                    if doc2_id in pending and doc2_id != doc1_id:
+                        pending[doc2_id].append(self._related_document(relationship, doc1_id))
                 
-                # Find relationships for current document
-                related_docs = []
-                for relationship in analysis.get('relationships', []):
-                    if relationship['doc1_id'] == current_doc_id:
-                        related_docs.append({
-                            'doc_id': relationship['doc2_id'],
-                            'similarity_score': relationship['similarity_score'],
-                            'relationship_type': relationship['relationship_type'],
-                            'shared_terms': relationship.get('shared_terms', []),
-                            'reason': f"Similar content (similarity: {relationship['similarity_score']:.2f})"
-                        })
-                    elif relationship['doc2_id'] == current_doc_id:
-                        related_docs.append({
-                            'doc_id': relationship['doc1_id'],
-                            'similarity_score': relationship['similarity_score'],
-                            'relationship_type': relationship['relationship_type'],
-                            'shared_terms': relationship.get('shared_terms', []),
-                            'reason': f"Similar content (similarity: {relationship['similarity_score']:.2f})"
-                        })
-                
-                # Sort by similarity score
-                related_docs.sort(key=lambda x: x['similarity_score'], reverse=True)
-                
-                return {
-                    'success': True,
-                    'current_document': current_doc_id,
-                    'suggestions': related_docs[:10],  # Top 10 suggestions
-                    'suggestion_count': len(related_docs)
-                }
-            else:
-                return {'error': 'No relationship data available. Run collection analysis first.'}
+                for doc_id, related_docs in pending.items():
+                    memo[doc_id] = {
+                        'success': True,
+                        'current_document': doc_id,
+                        # Top 10 by similarity score
+                        'suggestions': heapq.nlargest(10, related_docs, key=lambda x: x['similarity_score']),
+                        'suggestion_count': len(related_docs)
+                    }
+            
+            # Memoized entries stay private; callers get copies
+            return {doc_id: self._copy_suggestions(memo[doc_id]) for doc_id in doc_ids}
                 
         except Exception as e:
             self.logger.error(f"Document suggestions failed: {str(e)}")
-            return {
+            error = {
                 'success': False,
                 'error': str(e)
             }
+            return {doc_id: error for doc_id in doc_ids}
+    
+    @staticmethod
+    def _copy_suggestions(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a memoized suggestion entry that callers can modify freely"""
+        return {
+            **entry,
+            'suggestions': [
+                {**suggestion, 'shared_terms': list(suggestion['shared_terms'])}
+                for suggestion in entry['suggestions']
+            ]
+        }
+    
+    @staticmethod
+    def _related_document(relationship: Dict[str, Any], doc_id: str) -> Dict[str, Any]:
+        """Suggestion entry for the other document of a relationship"""
+        return {
+            'doc_id': doc_id,
+            'similarity_score': relationship['similarity_score'],
+            'relationship_type': relationship['relationship_type'],
+            'shared_terms': relationship.get('shared_terms', []),
+            'reason': f"Similar content (similarity: {relationship['similarity_score']:.2f})"
+        }
     
     def create_knowledge_graph(self, user_id: str = None) -> Dict[str, Any]:
         """
@@ -630,34 +885,63 @@ class AdvancedRAGSystem:
             Knowledge graph data
         """
         try:
-            if not HAS_NETWORKX:
-                return {'error': 'NetworkX library required for knowledge graph creation'}
+            if not HAS_SCIPY:
+                return {'error': 'SciPy library required for knowledge graph creation'}
             
             # Get relationship analysis
             cache_key = f"collection_analysis_{user_id or 'global'}"
-            if cache_key not in self.relationship_cache:
+            cached = self._get_cached_analysis(cache_key)
+            if cached:
+                analysis = cached['analysis']
+            else:
                 # Run analysis if not cached
                 analysis_result = self.analyze_document_collection(user_id)
                 if not analysis_result.get('success'):
                     return analysis_result
+                analysis = analysis_result['analysis']
+                cached = self.relationship_cache.get(cache_key, {})
+            
+            # The graph depends only on the analysis, so it is built once per
+            # cached analysis and dropped along with it. Callers get a copy
+            knowledge_graph = cached.get('knowledge_graph')
+            if knowledge_graph is not None:
+                return {
+                    'success': True,
+                    **_copy_knowledge_graph(knowledge_graph),
+                    'timestamp': datetime.now().isoformat()
+                }
             
-            analysis = self.relationship_cache[cache_key]['analysis']
+            # Nodes and edges are kept in insertion order; re-adding a node
+            # merges its attributes and re-adding an edge replaces them
+            node_index = {}
+            node_attrs = []
+            edges = {}
             
-            # Create graph
-            G = nx.Graph()
+            def add_node(node_id, **attrs):
+                idx = node_index.get(node_id)
+                if idx is None:
+                    idx = node_index[node_id] = len(node_attrs)
+                    node_attrs.append({'id': node_id})
+                node_attrs[idx].update(attrs)
+                return idx
+            
+            def add_edge(source, target, **attrs):
+                u, v = add_node(source), add_node(target)
+                edges[(u, v) if u <= v else (v, u)] = (u, v, attrs)
             
             # Add document nodes
+            relationships = analysis.get('relationships', [])
             documents = set()
-            for relationship in analysis.get('relationships', []):
+            for relationship in relationships:
                 documents.add(relationship['doc1_id'])
                 documents.add(relationship['doc2_id'])
             
             for doc_id in documents:
-                G.add_node(doc_id, type='document')
+                add_node(doc_id, type='document')
             
             # Add relationship edges
-            for relationship in analysis.get('relationships', []):
-                G.add_edge(
+            for relationship in relationships:
+                add_edge(
                     relationship['doc1_id'],
                     relationship['doc2_id'],
                     weight=relationship['similarity_score'],
@@ -668,30 +952,48 @@ class AdvancedRAGSystem:
             for entity_type, entities in analysis.get('shared_entities', {}).items():
                 for entity_info in entities:
                     entity_id = f"{entity_type}_{entity_info['entity']}"
-                    G.add_node(entity_id, type='entity', entity_type=entity_type, name=entity_info['entity'])
+                    add_node(entity_id, type='entity', entity_type=entity_type, name=entity_info['entity'])
                     
                     # Connect entity to documents
                     for doc_id in entity_info['documents']:
                         if doc_id in documents:
-                            G.add_edge(entity_id, doc_id, type='contains_entity')
+                            add_edge(entity_id, doc_id, type='contains_entity')
+            
+            # Symmetric 0/1 adjacency (CSR) for the graph metrics
+            n_nodes, n_edges = len(node_attrs), len(edges)
+            pairs = np.array(list(edges), dtype=np.int64).reshape(-1, 2)
+            pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+            adjacency = sparse.coo_matrix(
+                (np.ones(2 * len(pairs)),
+                 (np.concatenate([pairs[:, 0], pairs[:, 1]]), np.concatenate([pairs[:, 1], pairs[:, 0]]))),
+                shape=(n_nodes, n_nodes)
+            ).tocsr()
+            degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+            
+            # Local clustering: closed triangles through each node over its
+            # possible neighbour pairs (0 for nodes with fewer than 2 neighbours)
+            triangles = np.asarray((adjacency @ adjacency).multiply(adjacency).sum(axis=1)).ravel()
+            possible = degrees * (degrees - 1)
+            clustering = np.divide(triangles, possible, out=np.zeros(n_nodes), where=possible > 0)
             
             # Calculate graph metrics
             graph_metrics = {
-                'nodes': G.number_of_nodes(),
-                'edges': G.number_of_edges(),
-                'density': nx.density(G),
-                'connected_components': nx.number_connected_components(G),
-                'average_clustering': nx.average_clustering(G) if G.number_of_nodes() > 0 else 0
+                'nodes': n_nodes,
+                'edges': n_edges,
+                'density': 2 * n_edges / (n_nodes * (n_nodes - 1)) if n_nodes > 1 else 0,
+                'connected_components': int(connected_components(adjacency, directed=False)[0]) if n_nodes > 0 else 0,
+                'average_clustering': float(clustering.mean()) if n_nodes > 0 else 0
             }
             
-            # Find central documents
-            if G.number_of_nodes() > 0:
-                centrality = nx.degree_centrality(G)
-                central_docs = sorted(
-                    [(node, score) for node, score in centrality.items() if node in documents],
-                    key=lambda x: x[1],
-                    reverse=True
-                )[:5]
+            # Find central documents (degree centrality)
+            if n_nodes > 0:
+                centrality = degrees * (1.0 / (n_nodes - 1)) if n_nodes > 1 else np.ones(1)
+                central_docs = heapq.nlargest(
+                    5,
+                    [(attrs['id'], float(centrality[idx])) for idx, attrs in enumerate(node_attrs)
+                     if attrs['id'] in documents],
+                    key=lambda x: x[1]
+                )
             else:
                 central_docs = []
             
@@ -699,29 +1001,33 @@ class AdvancedRAGSystem:
             graph_data = {
                 'nodes': [
                     {
-                        'id': node,
-                        'type': G.nodes[node].get('type', 'unknown'),
-                        'label': G.nodes[node].get('name', node),
-                        'entity_type': G.nodes[node].get('entity_type', None)
+                        'id': attrs['id'],
+                        'type': attrs.get('type', 'unknown'),
+                        'label': attrs.get('name', attrs['id']),
+                        'entity_type': attrs.get('entity_type', None)
                     }
-                    for node in G.nodes()
+                    for attrs in node_attrs
                 ],
                 'edges': [
                     {
-                        'source': edge[0],
-                        'target': edge[1],
-                        'weight': G.edges[edge].get('weight', 1.0),
-                        'type': G.edges[edge].get('type', 'related')
+                        'source': node_attrs[u]['id'],
+                        'target': node_attrs[v]['id'],
+                        'weight': attrs.get('weight', 1.0),
+                        'type': attrs.get('type', 'related')
                     }
-                    for edge in G.edges()
+                    for u, v, attrs in edges.values()
                 ]
             }
             
-            return {
-                'success': True,
+            cached['knowledge_graph'] = knowledge_graph = {
                 'graph_data': graph_data,
                 'metrics': graph_metrics,
-                'central_documents': central_docs,
+                'central_documents': central_docs
+            }
+            
+            return {
+                'success': True,
+                **_copy_knowledge_graph(knowledge_graph),
                 'timestamp': datetime.now().isoformat()
             }
             
@@ -743,22 +1049,26 @@ class AdvancedRAGSystem:
             Search recommendations
         """
         try:
+            cached = self._recommendations_cache.get(user_id or None)
+            if cached is not None:
+                return self._copy_recommendations(cached)
+            
             user_history = self._get_user_search_history(user_id)
             
             if not user_history:
                 return {'message': 'No search history available for recommendations'}
             
-            # Analyze search patterns
-            common_terms = Counter()
-            for search in user_history:
-                query_terms = re.findall(r'\b[a-zA-Z]{3,}\b', search['query'].lower())
-                common_terms.update(query_terms)
+            # Analyze search patterns in one scan (newlines are word boundaries,
+            # so terms cannot run across queries)
+            common_terms = Counter(_QUERY_TERM_RE.findall(
+                '\n'.join(search['query'] for search in user_history).lower()
+            ))
             
             # Generate recommendations based on patterns
             recommendations = []
             
             # Expand on common terms
-            for term, count in common_terms.most_common(5):
+            for term, count in heapq.nlargest(5, common_terms.items(), key=itemgetter(1)):
                 recommendations.append({
                     'type': 'expand_topic',
                     'suggestion': f"Learn more about {term}",
@@ -774,11 +1084,12 @@ class AdvancedRAGSystem:
                 'reason': 'Discover connections between your interests'
             })
             
-            return {
+            self._recommendations_cache[user_id or None] = response = {
                 'success': True,
                 'recommendations': recommendations,
                 'based_on_searches': len(user_history)
             }
+            return self._copy_recommendations(response)
             
         except Exception as e:
             self.logger.error(f"Search recommendations failed: {str(e)}")
@@ -789,29 +1100,69 @@ class AdvancedRAGSystem:
     
     # Helper methods
     
+    @staticmethod
+    def _copy_recommendations(response: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a cached recommendations response that callers can modify freely"""
+        return {**response, 'recommendations': [dict(item) for item in response['recommendations']]}
+    
     def _enhance_search_results(self, base_results: List[Dict], query: str, user_id: str = None, context: Dict = None) -> List[Dict]:
         """Enhance search results with relationship information"""
         enhanced_results = []
+        preferences = self.user_preferences[user_id] if user_id and user_id in self.user_preferences else None
         
-        for result in base_results:
+        # Suggestions for every result document in one batch
+        doc_ids = [result.get('id', result.get('document_id')) for result in base_results]
+        suggestions_by_doc = self.get_document_suggestions_batch(list(dict.fromkeys(filter(None, doc_ids))), user_id)
+        
+        for result, doc_id in zip(base_results, doc_ids):
             enhanced_result = result.copy()
             
             # Add relationship information if available
-            doc_id = result.get('id', result.get('document_id'))
             if doc_id:
-                suggestions = self.get_document_suggestions(doc_id, user_id)
+                suggestions = suggestions_by_doc[doc_id]
                 if suggestions.get('success'):
                     enhanced_result['related_documents'] = suggestions['suggestions'][:3]  # Top 3
             
             # Add relevance scoring based on user preferences
-            if user_id and user_id in self.user_preferences:
-                relevance_boost = self._calculate_relevance_boost(result, self.user_preferences[user_id])
+            if preferences is not None:
+                content_lower = result.get('content', '').lower()
+                relevance_boost = self._calculate_relevance_boost(result, preferences, content_lower)
                 enhanced_result['relevance_score'] = result.get('score', 0) + relevance_boost
             
             enhanced_results.append(enhanced_result)
         
         return enhanced_results
     
+    def _get_cached_analysis(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Cached collection analysis entry, or None if missing or expired"""
+        entry = self.relationship_cache.get(cache_key)
+        if entry is not None and entry['expires_at'] <= time.monotonic():
+            del self.relationship_cache[cache_key]
+            return None
+        return entry
+    
+    def _cache_analysis(self, cache_key: str, entry: Dict[str, Any]):
+        """Store a collection analysis, dropping any expired entries"""
+        now = time.monotonic()
+        for key in [key for key, cached in self.relationship_cache.items() if cached['expires_at'] <= now]:
+            del self.relationship_cache[key]
+        entry['expires_at'] = now + self.relationship_cache_ttl
+        self.relationship_cache[cache_key] = entry
+    
+    @staticmethod
+    def _collection_fingerprint(documents: List[Dict[str, Any]]) -> str:
+        """Order-independent content hash of a document collection"""
+        h = hashlib.blake2b(digest_size=16)
+        for doc in sorted(documents, key=lambda d: str(d.get('id', ''))):
+            doc_id = str(doc.get('id', '')).encode('utf-8', 'surrogatepass')
+            content = str(doc.get('content', '')).encode('utf-8', 'surrogatepass')
+            # Length-prefixed so adjacent fields cannot run together
+            h.update(len(doc_id).to_bytes(8, 'little'))
+            h.update(doc_id)
+            h.update(len(content).to_bytes(8, 'little'))
+            h.update(content)
+        return h.hexdigest()
+    
     def _get_all_documents_from_rag(self) -> List[Dict[str, Any]]:
         """
         Get all documents from the base RAG system
@@ -821,65 +1172,90 @@ class AdvancedRAGSystem:
         # For now, return empty list
         return []
     
-    def _add_to_search_history(self, query: str, results: List[Dict], user_id: str = None):
-        """Add search to history"""
+    def _add_to_search_history(self, query: str, results: List[Dict], user_id: str = None,
+                               timestamp: Optional[str] = None):
+        """Add search to history (the bounded deque drops the oldest entry)"""
+        if not self.search_history.maxlen:
+            return
+        
         search_entry = {
             'query': query,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp or datetime.now().isoformat(),
             'result_count': len(results),
             'user_id': user_id
         }
         
+        if len(self.search_history) == self.search_history.maxlen:
+            # The entry about to be evicted is also the oldest in its user's index
+            evicted_user = self.search_history[0]['user_id']
+            user_history = self._history_by_user[evicted_user]
+            user_history.popleft()
+            if not user_history:
+                del self._history_by_user[evicted_user]
+            self._recommendations_cache.pop(evicted_user or None, None)
+        
         self.search_history.append(search_entry)
+        self._history_by_user[user_id].append(search_entry)
         
-        # Keep only last 100 searches
-        if len(self.search_history) > 100:
-            self.search_history = self.search_history[-100:]
+        # The whole-history view and this user's view both changed
+        self._recommendations_cache.pop(None, None)
+        self._recommendations_cache.pop(user_id or None, None)
     
     def _get_user_search_history(self, user_id: str = None) -> List[Dict]:
         """Get search history for a user"""
         if user_id:
-            return [search for search in self.search_history if search.get('user_id') == user_id]
-        return self.search_history
+            return list(self._history_by_user.get(user_id, ()))
+        return list(self.search_history)
     
-    def _calculate_relevance_boost(self, result: Dict, preferences: Dict) -> float:
+    def _calculate_relevance_boost(self, result: Dict, preferences: Dict,
+                                   content_lower: Optional[str] = None) -> float:
         """Calculate relevance boost based on user preferences"""
         # Simple implementation - could be much more sophisticated
-        boost = 0.0
+        content = content_lower if content_lower is not None else result.get('content', '').lower()
+        preferred_terms, terms = _prepared_topics(tuple(preferences.get('preferred_topics', [])))
+        # Distinct non-empty topics that occur in the content
+        if HAS_AHOCORASICK and len(preferred_terms) > 1:
+            # One automaton pass over the content instead of a scan per topic
+            found = set()
+            if terms:
+                for _, term in _topic_automaton(terms).iter(content):
+                    found.add(term)
+                    if len(found) == len(terms):
+                        break  # every topic seen
+        else:
+            found = {term for term in terms if term in content}
         
-        content = result.get('content', '').lower()
-        for preferred_term in preferences.get('preferred_topics', []):
-            if preferred_term.lower() in content:
+        # Each matching topic (duplicates included) is worth 0.1
+        boost = 0.0
+        for topic in preferred_terms:
+            if not topic:
+                boost += 0.1  # the empty topic matches any content
+            elif topic in found:
                 boost += 0.1
-        
         return boost
     
-    def _generate_search_insights(self, results: List[Dict], query: str) -> List[str]:
-        """Generate insights from search results"""
+    def _summarize_results(self, results: List[Dict]) -> Tuple[List[str], Dict[str, Any]]:
+        """Generate insights and relationship information from search results in one pass"""
         insights = []
+        related_count = sum(1 for result in results if result.get('related_documents'))
         
         if not results:
             insights.append("No results found. Try using different keywords or broader terms.")
-            return insights
-        
-        # Analyze result diversity
-        if len(results) > 1:
-            insights.append(f"Found {len(results)} relevant documents")
-        
-        # Check for related documents
-        related_count = sum(1 for result in results if result.get('related_documents'))
-        if related_count > 0:
-            insights.append(f"{related_count} results have related documents you might find interesting")
+        else:
+            # Analyze result diversity
+            if len(results) > 1:
+                insights.append(f"Found {len(results)} relevant documents")
+            
+            # Check for related documents
+            if related_count > 0:
+                insights.append(f"{related_count} results have related documents you might find interesting")
         
-        return insights
-    
-    def _get_result_relationships(self, results: List[Dict]) -> Dict[str, Any]:
-        """Get relationship information for search results"""
         # Placeholder for relationship data between search results
-        return {
+        relationship_data = {
             'result_count': len(results),
-            'has_relationships': any(result.get('related_documents') for result in results)
+            'has_relationships': related_count > 0
         }
+        return insights, relationship_data
     
     def _generate_collection_insights(self, analysis: Dict[str, Any]) -> List[str]:
         """Generate insights about the document collection"""
@@ -906,7 +1282,7 @@ def main():
     print("Advanced RAG System initialized")
     print(f"Has ChromaDB: {HAS_CHROMADB}")
     print(f"Has sklearn: {HAS_SKLEARN}")
-    print(f"Has NetworkX: {HAS_NETWORKX}")
+    print(f"Has SciPy: {HAS_SCIPY}")
 
 
 if __name__ == "__main__":
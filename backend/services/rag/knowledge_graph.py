@@ -331,9 +331,10 @@ class KnowledgeGraph:
                         entities_added += 1
                     else:
                         # Update existing entity
-                        if document_id not in self.graph.nodes[entity_id]['documents']:
-                            self.graph.nodes[entity_id]['documents'].append(document_id)
-                        self.graph.nodes[entity_id]['total_mentions'] += 1
+                        entity_data = self.graph.nodes[entity_id]
+                        if document_id not in entity_data['documents']:
+                            entity_data['documents'].append(document_id)
+                        entity_data['total_mentions'] += 1
                     
                     # Add relationship between document and entity
                     self.graph.add_edge(
@@ -363,7 +364,9 @@ class KnowledgeGraph:
             
             # Update metadata
             self.metadata['documents_processed'] += 1
-            self.metadata['total_entities'] = len([n for n in self.graph.nodes() if self.graph.nodes[n]['type'] == 'entity'])
+            self.metadata['total_entities'] = sum(
+                1 for _, node_type in self.graph.nodes(data='type') if node_type == 'entity'
+            )
             self.metadata['total_relationships'] = self.graph.number_of_edges()
             
             return {
@@ -392,17 +395,19 @@ class KnowledgeGraph:
             if document_id not in self.graph:
                 return {'error': 'Document not found in knowledge graph'}
             
-            # Get direct connections (entities in the document)
+            # Get direct connections (entities in the document); adjacency and
+            # node attributes are each looked up once per neighbor
+            nodes = self.graph.nodes
             direct_entities = []
-            for neighbor in self.graph.neighbors(document_id):
-                if self.graph.nodes[neighbor]['type'] == 'entity':
-                    edge_data = self.graph[document_id][neighbor]
+            for neighbor, edge_data in self.graph[document_id].items():
+                neighbor_data = nodes[neighbor]
+                if neighbor_data['type'] == 'entity':
                     if edge_data:
-                        edge_info = list(edge_data.values())[0]  # Get first edge data
+                        edge_info = next(iter(edge_data.values()))  # Get first edge data
                         direct_entities.append({
                             'entity_id': neighbor,
-                            'entity_type': self.graph.nodes[neighbor]['entity_type'],
-                            'text': self.graph.nodes[neighbor]['text'],
+                            'entity_type': neighbor_data['entity_type'],
+                            'text': neighbor_data['text'],
                             'confidence': edge_info.get('confidence', 0),
                             'context': edge_info.get('context', '')
                         })
@@ -412,7 +417,7 @@ class KnowledgeGraph:
             for entity in direct_entities:
                 entity_id = entity['entity_id']
                 for doc_neighbor in self.graph.neighbors(entity_id):
-                    if (self.graph.nodes[doc_neighbor]['type'] == 'document' and 
+                    if (nodes[doc_neighbor]['type'] == 'document' and 
                         doc_neighbor != document_id):
                         related_documents[doc_neighbor].append(entity)
             
@@ -456,6 +461,7 @@ class KnowledgeGraph:
         try:
             results = []
             query_lower = query.lower()
+            node_types = dict(self.graph.nodes(data='type'))
             
             for node_id, node_data in self.graph.nodes(data=True):
                 if node_data['type'] == 'entity':
@@ -474,10 +480,10 @@ class KnowledgeGraph:
                     
                     if relevance > 0:
                         # Get connected documents
-                        connected_docs = []
-                        for neighbor in self.graph.neighbors(node_id):
-                            if self.graph.nodes[neighbor]['type'] == 'document':
-                                connected_docs.append(neighbor)
+                        connected_docs = [
+                            neighbor for neighbor in self.graph.neighbors(node_id)
+                            if node_types[neighbor] == 'document'
+                        ]
                         
                         results.append({
                             'entity_id': node_id,
@@ -525,7 +531,11 @@ class KnowledgeGraph:
                 'relationship_types': {}
             }
             
-            # Count node types
+            # One pass over the nodes: count node types, and collect entities
+            # by mention count and documents by connections
+            entities_by_mentions = []
+            docs_by_connections = []
+            degree = self.graph.degree
             for node, data in self.graph.nodes(data=True):
                 node_type = data.get('type', 'unknown')
                 analytics['node_types'][node_type] = analytics['node_types'].get(node_type, 0) + 1
@@ -533,34 +543,23 @@ class KnowledgeGraph:
                 if node_type == 'entity':
                     entity_type = data.get('entity_type', 'unknown')
                     analytics['entity_types'][entity_type] = analytics['entity_types'].get(entity_type, 0) + 1
-            
-            # Find top entities by mention count
-            entities_by_mentions = []
-            for node, data in self.graph.nodes(data=True):
-                if data.get('type') == 'entity':
-                    mentions = data.get('total_mentions', 1)
                     entities_by_mentions.append({
                         'entity_id': node,
                         'text': data.get('text', ''),
                         'entity_type': data.get('entity_type', ''),
-                        'mentions': mentions,
+                        'mentions': data.get('total_mentions', 1),
                         'document_count': len(data.get('documents', []))
                     })
-            
-            entities_by_mentions.sort(key=lambda x: x['mentions'], reverse=True)
-            analytics['top_entities'] = entities_by_mentions[:10]
-            
-            # Find most connected documents
-            docs_by_connections = []
-            for node, data in self.graph.nodes(data=True):
-                if data.get('type') == 'document':
-                    degree = self.graph.degree(node)
+                elif node_type == 'document':
                     docs_by_connections.append({
                         'document_id': node,
-                        'connections': degree,
+                        'connections': degree(node),
                         'entity_count': data.get('entity_count', 0)
                     })
             
+            entities_by_mentions.sort(key=lambda x: x['mentions'], reverse=True)
+            analytics['top_entities'] = entities_by_mentions[:10]
+            
             docs_by_connections.sort(key=lambda x: x['connections'], reverse=True)
             analytics['most_connected_documents'] = docs_by_connections[:10]
             
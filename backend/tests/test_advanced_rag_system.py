@@ -0,0 +1,148 @@
+"""Tests for the AdvancedRAGSystem knowledge graph and cached results."""
+
+from __future__ import annotations
+
+import pytest
+
+from backend.services.rag.advanced_rag_system import AdvancedRAGSystem
+
+nx = pytest.importorskip("networkx")
+pytest.importorskip("scipy")
+
+ANALYSES = {
+    "empty": {"relationships": [], "shared_entities": {}},
+    # An entity whose documents are all unrelated is the only node
+    "single": {
+        "relationships": [],
+        "shared_entities": {"materials": [{"entity": "PCB", "documents": ["d1"]}]},
+    },
+    "collection": {
+        "relationships": [
+            {"doc1_id": "d1", "doc2_id": "d2", "similarity_score": 0.8, "relationship_type": "very_similar"},
+            {"doc1_id": "d2", "doc2_id": "d3", "similarity_score": 0.6, "relationship_type": "similar"},
+            {"doc1_id": "d1", "doc2_id": "d3", "similarity_score": 0.4, "relationship_type": "related"},
+            {"doc1_id": "d3", "doc2_id": "d4", "similarity_score": 0.35, "relationship_type": "weakly_related"},
+            {"doc1_id": "d5", "doc2_id": "d6", "similarity_score": 0.5, "relationship_type": "related"},
+            # Repeated pair: the later attributes win
+            {"doc1_id": "d2", "doc2_id": "d1", "similarity_score": 0.9, "relationship_type": "very_similar"},
+        ],
+        "shared_entities": {
+            "materials": [
+                {"entity": "PCB", "documents": ["d1", "d2", "d4"]},
+                {"entity": "Mold", "documents": ["d5", "d7"]},
+            ],
+            "measurements": [{"entity": "warpage", "documents": ["d8"]}],
+        },
+    },
+}
+
+
+def _networkx_graph(analysis):
+    """Build the graph the way create_knowledge_graph did on networkx."""
+    graph = nx.Graph()
+    documents = set()
+    for relationship in analysis["relationships"]:
+        documents.add(relationship["doc1_id"])
+        documents.add(relationship["doc2_id"])
+    for doc_id in documents:
+        graph.add_node(doc_id, type="document")
+    for relationship in analysis["relationships"]:
+        graph.add_edge(relationship["doc1_id"], relationship["doc2_id"],
+                       weight=relationship["similarity_score"], type=relationship["relationship_type"])
+    for entity_type, entities in analysis["shared_entities"].items():
+        for entity_info in entities:
+            entity_id = f"{entity_type}_{entity_info['entity']}"
+            graph.add_node(entity_id, type="entity", entity_type=entity_type, name=entity_info["entity"])
+            for doc_id in entity_info["documents"]:
+                if doc_id in documents:
+                    graph.add_edge(entity_id, doc_id, type="contains_entity")
+    return graph, documents
+
+
+@pytest.fixture
+def rag(tmp_path):
+    config_path = tmp_path / "config.json"
+    config_path.write_text("{}", encoding="utf-8")
+    return AdvancedRAGSystem(config_path=str(config_path))
+
+
+@pytest.mark.parametrize("name", sorted(ANALYSES))
+def test_knowledge_graph_matches_networkx(rag, name):
+    analysis = ANALYSES[name]
+    rag._cache_analysis(f"collection_analysis_{name}", {"analysis": analysis})
+
+    result = rag.create_knowledge_graph(name)
+    graph, documents = _networkx_graph(analysis)
+
+    assert result["success"]
+    metrics = result["metrics"]
+    assert metrics["nodes"] == graph.number_of_nodes()
+    assert metrics["edges"] == graph.number_of_edges()
+    assert metrics["density"] == pytest.approx(nx.density(graph))
+    assert metrics["connected_components"] == nx.number_connected_components(graph)
+    expected_clustering = nx.average_clustering(graph) if graph.number_of_nodes() > 0 else 0
+    assert metrics["average_clustering"] == pytest.approx(expected_clustering)
+
+    centrality = nx.degree_centrality(graph) if graph.number_of_nodes() > 0 else {}
+    expected_central = sorted(
+        [(node, score) for node, score in centrality.items() if node in documents],
+        key=lambda x: x[1],
+        reverse=True
+    )[:5]
+    central = result["central_documents"]
+    assert [node for node, _ in central] == [node for node, _ in expected_central]
+    assert [score for _, score in central] == pytest.approx([score for _, score in expected_central])
+
+    # Same nodes and edges; graph_data lists them in insertion order
+    graph_data = result["graph_data"]
+    assert {node["id"] for node in graph_data["nodes"]} == set(graph.nodes)
+    assert {frozenset((edge["source"], edge["target"])): (edge["weight"], edge["type"])
+            for edge in graph_data["edges"]} == {
+        frozenset((u, v)): (attrs.get("weight", 1.0), attrs.get("type", "related"))
+        for u, v, attrs in graph.edges(data=True)
+    }
+
+
+def test_cached_knowledge_graph_is_returned_as_a_copy(rag):
+    rag._cache_analysis("collection_analysis_copy", {"analysis": ANALYSES["collection"]})
+    first = rag.create_knowledge_graph("copy")
+    expected = rag.create_knowledge_graph("copy")
+
+    first["graph_data"]["nodes"][0]["label"] = "changed"
+    first["graph_data"]["edges"].clear()
+    first["metrics"]["nodes"] = 0
+    first["central_documents"].clear()
+
+    again = rag.create_knowledge_graph("copy")
+    assert {key: again[key] for key in ("graph_data", "metrics", "central_documents")} == \
+        {key: expected[key] for key in ("graph_data", "metrics", "central_documents")}
+
+
+def test_memoized_suggestions_are_returned_as_copies(rag):
+    analysis = {"relationships": [
+        {"doc1_id": "d1", "doc2_id": "d2", "similarity_score": 0.8, "relationship_type": "very_similar",
+         "shared_terms": ["pcb", "warpage"]},
+    ]}
+    rag._cache_analysis("collection_analysis_memo", {"analysis": analysis})
+    expected = rag.get_document_suggestions("d1", "memo")
+
+    first = rag.get_document_suggestions_batch(["d1", "d2"], "memo")
+    first["d1"]["suggestions"][0]["shared_terms"].append("changed")
+    first["d1"]["suggestions"].clear()
+    first["d2"]["suggestion_count"] = 0
+
+    assert rag.get_document_suggestions("d1", "memo") == expected
+    assert rag.get_document_suggestions("d2", "memo")["suggestion_count"] == 1
+    assert analysis["relationships"][0]["shared_terms"] == ["pcb", "warpage"]
+
+
+def test_cached_recommendations_are_returned_as_copies(rag):
+    for query in ("pcb warpage", "pcb layers", "mold warpage"):
+        rag._add_to_search_history(query, [], "alice")
+    expected = rag.get_search_recommendations("alice")
+
+    first = rag.get_search_recommendations("alice")
+    first["recommendations"][0]["query"] = "changed"
+    first["recommendations"].clear()
+
+    assert rag.get_search_recommendations("alice") == expected
@@ -0,0 +1,145 @@
+"""Tests for FileHandler uploads and the append-only metadata log."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+
+import pytest
+
+from backend.services.files.file_handler import FileHandler
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    return tmp_path / "uploads"
+
+
+@pytest.fixture
+def handler(upload_dir):
+    return FileHandler(upload_dir=str(upload_dir), max_file_size=1024)
+
+
+def _log_records(handler):
+    with open(handler.metadata_file, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _save(handler, name, user_id="alice", data=b"hello"):
+    result = handler.save_uploaded_file(data, name, user_id)
+    assert result["success"], result
+    return result["file_id"]
+
+
+def test_metadata_log_replays_in_second_instance(handler, upload_dir):
+    first = _save(handler, "a.txt")
+    second = _save(handler, "b.txt")
+    other = _save(handler, "c.txt", user_id="bob")
+    assert handler.flush(timeout=5)
+
+    assert [record["file_id"] for record in _log_records(handler)] == [first, second, other]
+
+    reloaded = FileHandler(upload_dir=str(upload_dir), max_file_size=1024)
+    assert {f["file_id"] for f in reloaded.list_user_files("alice")} == {first, second}
+    assert [f["file_id"] for f in reloaded.list_user_files("bob")] == [other]
+    assert reloaded.get_file_info(first, "alice")["original_name"] == "a.txt"
+    assert reloaded.get_file_info(first, "bob") is None
+
+
+def test_delete_appends_tombstone(handler, upload_dir):
+    kept = _save(handler, "keep.txt")
+    removed = _save(handler, "drop.txt")
+    file_path = handler.get_file_info(removed, "alice")["file_path"]
+
+    assert handler.delete_file(removed, "alice")
+    assert handler.flush(timeout=5)
+
+    assert _log_records(handler)[-1] == {"file_id": removed, "deleted": True}
+    assert not os.path.exists(file_path)
+    assert handler.get_file_info(removed, "alice") is None
+
+    reloaded = FileHandler(upload_dir=str(upload_dir), max_file_size=1024)
+    assert [f["file_id"] for f in reloaded.list_user_files("alice")] == [kept]
+
+
+def test_second_instance_sees_appends_from_first(handler, upload_dir):
+    reader = FileHandler(upload_dir=str(upload_dir), max_file_size=1024)
+    assert reader.list_user_files("alice") == []
+
+    file_id = _save(handler, "late.txt")
+    assert handler.flush(timeout=5)
+
+    assert [f["file_id"] for f in reader.list_user_files("alice")] == [file_id]
+
+
+def test_compaction_keeps_one_record_per_live_file(handler, upload_dir, monkeypatch):
+    monkeypatch.setattr(FileHandler, "METADATA_COMPACT_MIN", 3)
+    # Records are counted as the log is re-read, so let each append land first
+    file_ids = []
+    for i in range(3):
+        file_ids.append(_save(handler, f"file{i}.txt"))
+        assert handler.flush(timeout=5)
+    for file_id in file_ids[:2]:
+        assert handler.delete_file(file_id, "alice")
+        assert handler.flush(timeout=5)
+
+    assert [record["file_id"] for record in _log_records(handler)] == [file_ids[2]]
+
+    reloaded = FileHandler(upload_dir=str(upload_dir), max_file_size=1024)
+    assert [f["file_id"] for f in reloaded.list_user_files("alice")] == [file_ids[2]]
+
+
+def test_oversized_stream_is_rejected_and_removed(handler, upload_dir):
+    result = handler.save_uploaded_stream(io.BytesIO(b"x" * 5000), "big.txt", "alice", chunk_size=256)
+
+    assert not result["success"]
+    assert "too large" in result["error"].lower()
+    assert list((upload_dir / "alice").iterdir()) == []
+    assert handler.list_user_files("alice") == []
+
+
+def test_stream_within_limit_is_saved_in_chunks(handler):
+    data = bytes(range(256)) * 4
+    result = handler.save_uploaded_stream(io.BytesIO(data), "exact.txt", "alice", chunk_size=100)
+
+    assert result["success"]
+    assert result["file_size"] == len(data)
+    with open(result["file_path"], "rb") as f:
+        assert f.read() == data
+
+
+def test_failed_metadata_write_is_retried(handler, upload_dir, monkeypatch):
+    monkeypatch.setattr(FileHandler, "METADATA_RETRY_DELAY", 0.01)
+    real_open = os.open
+    failures = []
+
+    def flaky_open(path, *args, **kwargs):
+        if str(path) == str(handler.metadata_file) and len(failures) < 2:
+            failures.append(path)
+            raise OSError(28, "No space left on device")
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "open", flaky_open)
+    file_id = _save(handler, "retry.txt")
+    assert handler.flush(timeout=5)
+    monkeypatch.undo()
+
+    assert len(failures) == 2
+    assert [record["file_id"] for record in _log_records(handler)] == [file_id]
+    reloaded = FileHandler(upload_dir=str(upload_dir), max_file_size=1024)
+    assert [f["file_id"] for f in reloaded.list_user_files("alice")] == [file_id]
+
+
+def test_lookups_do_not_wait_for_log_write(handler):
+    _save(handler, "first.txt")
+    assert handler.flush(timeout=5)
+
+    # Stall the writer mid-append; the index stays readable and writable
+    with handler._meta_write_lock:
+        file_id = _save(handler, "second.txt")
+        assert handler.get_file_info(file_id, "alice")["original_name"] == "second.txt"
+        assert len(handler.list_user_files("alice")) == 2
+        assert not handler.flush(timeout=0.05)
+
+    assert handler.flush(timeout=5)
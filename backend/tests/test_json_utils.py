@@ -0,0 +1,86 @@
+"""Tests for the one-pass and streaming JSON analysis helpers."""
+
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from backend.services.agents.tools.json_analyzer import JSONAnalyzerTool
+from backend.utils.exceptions import JSONValidationError
+from backend.utils.json_utils import analyze_json, analyze_json_stream
+
+pytest.importorskip("ijson")
+
+DOCUMENTS = [
+    {
+        "materials": [
+            {"name": "PCB", "warpage": 0.12, "layers": 4, "tested": True},
+            {"name": "Mold", "warpage": -1.5, "layers": 2, "tested": False},
+        ],
+        "total": 2,
+        "meta": {"owner": None, "scores": [1, 2.5, [3, 4]]},
+    },
+    [1, 2.25, "x", None, True, {"a": {"b": {"c": 7}}}],
+    [[{"deep": [1, [2, [3]]]}]],
+    {},
+    [],
+    42,
+    "text",
+]
+
+
+def _normalized(result):
+    stats, numeric_fields = result
+    if "item_types" in stats:
+        stats = dict(stats, item_types=sorted(stats["item_types"]))
+    return stats, numeric_fields
+
+
+@pytest.mark.parametrize("data", DOCUMENTS)
+@pytest.mark.parametrize("max_depth", [10, 2])
+def test_stream_matches_in_memory_analysis(tmp_path, data, max_depth):
+    path = tmp_path / "doc.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    expected = _normalized(analyze_json(data, max_depth=max_depth))
+    assert _normalized(analyze_json_stream(path, max_depth=max_depth)) == expected
+    assert _normalized(analyze_json_stream(str(path), max_depth=max_depth)) == expected
+
+
+@pytest.mark.parametrize("data", DOCUMENTS + [
+    {"quote\"d": "tab\t and \u00e9 and \U0001f600", 1: -0.0, 2.5: 1e16, True: None, None: False},
+    [float("nan"), float("inf"), -float("inf"), 10 ** 30, 1.5e-300, [], {}, [[]], ""],
+])
+def test_size_matches_serialized_length(data):
+    assert analyze_json(data)[0]["size_bytes"] == len(json.dumps(data))
+
+
+def test_stream_accepts_file_objects_and_skips_numerics():
+    data = DOCUMENTS[0]
+    raw = json.dumps(data).encode("utf-8")
+
+    stats, numeric_fields = analyze_json_stream(io.BytesIO(raw), collect_numeric=False)
+
+    assert stats == analyze_json(data)[0]
+    assert numeric_fields == {}
+
+
+def test_stream_rejects_malformed_json():
+    with pytest.raises(JSONValidationError):
+        analyze_json_stream(io.BytesIO(b'{"a": [1, 2'))
+
+
+def test_analyzer_summary_returns_data_and_overview_combines():
+    tool = JSONAnalyzerTool()
+    data = DOCUMENTS[0]
+
+    assert tool.execute(data, analysis_type="summary") == {"success": True, "analysis_type": "summary", "data": data}
+
+    overview = tool.execute(data, analysis_type="overview")
+    structure = tool.execute(data, analysis_type="structure")
+    fields = tool.execute(data, analysis_type="fields")
+    assert overview["analysis_type"] == "overview"
+    assert overview["keys"] == structure["keys"]
+    assert overview["numeric_fields"] == fields["numeric_fields"]
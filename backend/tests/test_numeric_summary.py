@@ -0,0 +1,39 @@
+"""Tests for the numeric summary walkers."""
+
+from __future__ import annotations
+
+import pytest
+
+from backend.services.agents.tools.numeric_summary import _bfs_collect_py
+
+# Skipped unless the extension has been built in place
+numeric_summary_cy = pytest.importorskip("backend.services.agents.tools._numeric_summary_cy")
+
+DOCUMENTS = [
+    {
+        "materials": [
+            {"name": "PCB", "warpage": 0.12, "layers": 4, "tested": True},
+            {"name": "Mold", "warpage": -1.5, "layers": 2, "cost": 3},
+            {"id": 7, "warpage": 2.25, "notes": None},
+        ],
+        "total": 3,
+        "ratio": 0.5,
+        "meta": {"owner": "lab", "scores": [1, 2.5, [3, 4]], "flags": [True, False]},
+    },
+    [1, 2.25, "x", None, True, {"a": {"b": {"c": 7}}}, [8, 9]],
+    [[{"deep": [1, [2, [3]]], "title": "t"}], {"key": "k", "v": 10 ** 20}],
+    {"runs": [{"run": i, "temperature": 20 + i * 0.25, "pressure": [i, i + 1]} for i in range(40)]},
+    {f"sensor_{i}": {"readings": [i, i * 2.5], "peak": i * 3} for i in range(30)},
+    {},
+    [],
+    42,
+    "text",
+]
+
+
+@pytest.mark.parametrize("data", DOCUMENTS)
+@pytest.mark.parametrize("max_sections,max_child_items", [(20, 50), (3, 2)])
+@pytest.mark.parametrize("prune_non_numeric", [True, False])
+def test_compiled_walk_matches_python(data, max_sections, max_child_items, prune_non_numeric):
+    expected = _bfs_collect_py(data, max_sections, max_child_items, prune_non_numeric)
+    assert numeric_summary_cy._bfs_collect(data, max_sections, max_child_items, prune_non_numeric) == expected
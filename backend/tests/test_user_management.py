@@ -0,0 +1,111 @@
+"""Tests for UserManager write-behind persistence and session backends."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from backend.core.user_management import UserManager
+
+
+@pytest.fixture
+def store_paths(tmp_path):
+    return str(tmp_path / "users.json"), str(tmp_path / "user_sessions.json")
+
+
+@pytest.fixture
+def manager(store_paths):
+    # Long interval: the tests drive flush() themselves
+    users_file, sessions_file = store_paths
+    user_manager = UserManager(users_file, sessions_file, flush_interval=3600)
+    yield user_manager
+    user_manager.close()
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_flush_writes_users_and_sessions(manager, store_paths):
+    users_file, sessions_file = store_paths
+    assert manager.create_user("alice", "secret", "alice@example.com")
+    user = manager.authenticate_user("alice", "secret")
+    token = manager.create_session(user)
+
+    manager.flush()
+
+    assert "alice" in _read(users_file)
+    assert _read(sessions_file)[token]["username"] == "alice"
+
+    reloaded = UserManager(users_file, sessions_file, flush_interval=3600)
+    try:
+        assert reloaded.authenticate_user("alice", "secret")["email"] == "alice@example.com"
+        assert reloaded.validate_session(token)["user_id"] == "alice"
+    finally:
+        reloaded.close()
+
+
+def test_flush_refreshes_touched_session_activity(manager, store_paths):
+    _, sessions_file = store_paths
+    user = manager.authenticate_user("admin", "administrator")
+    token = manager.create_session(user)
+    manager.sessions[token]["last_activity_ts"] = 0.0
+    manager.sessions[token]["last_activity"] = "1970-01-01T00:00:00"
+
+    manager.validate_session(token)
+    manager.flush()
+
+    assert _read(sessions_file)[token]["last_activity"] != "1970-01-01T00:00:00"
+    assert not manager._touched_sessions
+
+
+def test_close_stops_writer_and_flushes(store_paths):
+    users_file, sessions_file = store_paths
+    user_manager = UserManager(users_file, sessions_file, flush_interval=3600)
+    user_manager.create_user("bob", "secret", "bob@example.com")
+
+    user_manager.close()
+    user_manager._flush_thread.join(timeout=5)
+
+    assert not user_manager._flush_thread.is_alive()
+    assert "bob" in _read(users_file)
+
+
+def test_failed_write_keeps_store_dirty(manager, store_paths, monkeypatch):
+    users_file, _ = store_paths
+    manager.create_user("carol", "secret", "carol@example.com")
+
+    def fail(path, data):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(manager, "_write_json", fail)
+        manager.flush()
+    assert manager._users_dirty
+
+    manager.flush()
+    assert "carol" in _read(users_file)
+
+
+def test_sqlite_session_backend(store_paths, tmp_path):
+    users_file, sessions_file = store_paths
+    user_manager = UserManager(users_file, sessions_file, flush_interval=3600, session_backend="sqlite")
+    try:
+        user = user_manager.authenticate_user("admin", "administrator")
+        token = user_manager.create_session(user)
+        assert (tmp_path / "user_sessions.db").exists()
+        assert user_manager.validate_session(token)["username"] == "admin"
+    finally:
+        user_manager.close()
+
+    reloaded = UserManager(users_file, sessions_file, flush_interval=3600, session_backend="sqlite")
+    try:
+        assert reloaded.validate_session(token)["username"] == "admin"
+        assert len(reloaded.get_active_sessions()) == 1
+        assert reloaded.logout_session(token)
+        assert reloaded.validate_session(token) is None
+    finally:
+        reloaded.close()
+    assert not (tmp_path / "user_sessions.json").exists()
@@ -5,7 +5,9 @@ JSON utility functions for data manipulation and analysis.
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, List, Optional
+import os
+from json.encoder import encode_basestring_ascii
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
 
 from backend.utils.exceptions import JSONValidationError
 
@@ -127,10 +129,15 @@ def get_json_statistics(data: Any) -> Dict[str, Any]:
     Returns:
         Dictionary with statistics (type, size, depth, keys, etc.)
     """
+    return analyze_json(data, collect_numeric=False)[0]
+
+
+def _build_statistics(data: Any, size_bytes: int, depth: int) -> Dict[str, Any]:
+    """Assemble the get_json_statistics() result from precomputed size and depth."""
     stats = {
         'type': type(data).__name__,
-        'size_bytes': len(json.dumps(data)),
-        'depth': calculate_json_depth(data),
+        'size_bytes': size_bytes,
+        'depth': depth,
         'array_length': 0,
         'key_count': 0,
         'keys': []
@@ -225,3 +232,201 @@ def extract_numeric_fields(data: Any, max_depth: int = 10) -> Dict[str, List[flo
 
     traverse(data)
     return numeric_fields
+
+
+def analyze_json(
+    data: Any,
+    max_depth: int = 10,
+    collect_numeric: bool = True,
+) -> Tuple[Dict[str, Any], Dict[str, List[float]]]:
+    """
+    Compute get_json_statistics() and extract_numeric_fields() in one traversal.
+
+    size_bytes is summed from the nodes as they are visited, so the data is
+    never serialized.
+
+    Args:
+        data: JSON data structure
+        max_depth: Maximum depth at which numeric values are collected
+        collect_numeric: Skip numeric extraction when only statistics are needed
+
+    Returns:
+        Tuple of (statistics, numeric fields)
+    """
+    numeric_fields: Dict[str, List[float]] = {}
+    size = 0
+
+    def traverse(obj: Any, path: str, depth: int) -> int:
+        """Collect numerics below obj, add its json.dumps() length to size and return the deepest level reached."""
+        nonlocal size
+        if isinstance(obj, dict):
+            # Braces, ': ' after each key and ', ' between items
+            size += 4 * len(obj) if obj else 2
+            deepest = depth
+            for key, value in obj.items():
+                size += _json_key_length(key)
+                child_path = f"{path}.{key}" if path else key
+                deepest = max(deepest, traverse(value, child_path, depth + 1))
+            return deepest
+
+        elif isinstance(obj, list):
+            # Brackets and ', ' between items
+            size += 2 * len(obj) if obj else 2
+            deepest = depth
+            for item in obj:
+                deepest = max(deepest, traverse(item, path, depth + 1))
+            return deepest
+
+        if isinstance(obj, str):
+            size += len(encode_basestring_ascii(obj))
+            return depth
+
+        size += _json_scalar_length(obj)
+        if (collect_numeric and depth <= max_depth
+                and isinstance(obj, (int, float)) and not isinstance(obj, bool)):
+            if path not in numeric_fields:
+                numeric_fields[path] = []
+            numeric_fields[path].append(float(obj))
+
+        return depth
+
+    depth = traverse(data, "", 0)
+    return _build_statistics(data, size, depth), numeric_fields
+
+
+def _json_scalar_length(value: Any) -> int:
+    """Length of json.dumps(value) for a non-container value."""
+    if isinstance(value, str):
+        return len(encode_basestring_ascii(value))
+    if value is None or value is True:
+        return 4
+    if value is False:
+        return 5
+    if isinstance(value, int):
+        return len(int.__repr__(value))
+    if isinstance(value, float):
+        if value != value:
+            return 3  # NaN
+        if value == float('inf'):
+            return 8  # Infinity
+        if value == float('-inf'):
+            return 9  # -Infinity
+        return len(float.__repr__(value))
+    # Tuples and other values json.dumps() accepts (or rejects) are rare here
+    return len(json.dumps(value))
+
+
+def _json_key_length(key: Any) -> int:
+    """Length of a dict key as json.dumps() writes it, quotes included."""
+    if isinstance(key, str):
+        return len(encode_basestring_ascii(key))
+    if key is None or isinstance(key, (int, float)):
+        # Converted to their JSON text and quoted
+        return _json_scalar_length(key) + 2
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+_IJSON_VALUE_TYPES = {
+    'start_map': 'dict',
+    'start_array': 'list',
+    'string': 'str',
+    'boolean': 'bool',
+    'null': 'NoneType',
+}
+
+
+def analyze_json_stream(
+    source: Union[str, os.PathLike, IO[bytes]],
+    max_depth: int = 10,
+    collect_numeric: bool = True,
+) -> Tuple[Dict[str, Any], Dict[str, List[float]]]:
+    """
+    Streaming variant of analyze_json() for documents too large to load.
+
+    Walks ijson parse events, so memory stays proportional to nesting depth
+    (plus any collected numeric values) rather than document size.
+
+    Args:
+        source: Path to a JSON file or a binary file object
+        max_depth: Maximum depth at which numeric values are collected
+        collect_numeric: Skip numeric extraction when only statistics are needed
+
+    Returns:
+        Tuple of (statistics, numeric fields), with size_bytes taken from the file
+
+    Raises:
+        JSONValidationError: If ijson is unavailable or the document is malformed
+    """
+    try:
+        import ijson
+    except ImportError as e:
+        raise JSONValidationError("Streaming JSON analysis requires the ijson library") from e
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as handle:
+            return analyze_json_stream(handle, max_depth, collect_numeric)
+
+    stats: Dict[str, Any] = {
+        'type': None,
+        'size_bytes': 0,
+        'depth': 0,
+        'array_length': 0,
+        'key_count': 0,
+        'keys': []
+    }
+    numeric_fields: Dict[str, List[float]] = {}
+    item_types: set = set()
+
+    # One (is_map, path) entry per open container
+    containers: List[Tuple[bool, str]] = []
+    key = ""
+
+    try:
+        for _, event, value in ijson.parse(source):
+            if event == 'map_key':
+                key = value
+                if len(containers) == 1:
+                    stats['key_count'] += 1
+                    stats['keys'].append(value)
+                continue
+
+            if event in ('end_map', 'end_array'):
+                containers.pop()
+                continue
+
+            level = len(containers)
+            if containers:
+                is_map, parent_path = containers[-1]
+                path = (f"{parent_path}.{key}" if parent_path else key) if is_map else parent_path
+            else:
+                path = ""
+
+            stats['depth'] = max(stats['depth'], level)
+            value_type = _IJSON_VALUE_TYPES.get(event) or ('int' if isinstance(value, int) else 'float')
+            if level == 0:
+                stats['type'] = value_type
+            elif level == 1 and stats['type'] == 'list':
+                stats['array_length'] += 1
+                if stats['array_length'] <= 100:
+                    item_types.add(value_type)
+
+            if event in ('start_map', 'start_array'):
+                containers.append((event == 'start_map', path))
+            elif event == 'number' and collect_numeric and level <= max_depth:
+                numeric_fields.setdefault(path, []).append(float(value))
+    except ijson.JSONError as e:
+        raise JSONValidationError(f"Invalid JSON: {e}") from e
+
+    if stats['type'] == 'list':
+        stats['type'] = 'array'
+        if item_types:
+            stats['item_types'] = list(item_types)
+    elif stats['type'] == 'dict':
+        stats['type'] = 'object'
+
+    try:
+        stats['size_bytes'] = os.fstat(source.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        stats['size_bytes'] = source.tell() if hasattr(source, 'tell') else 0
+
+    return stats, numeric_fields